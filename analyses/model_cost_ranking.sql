@@ -0,0 +1,78 @@
+-- Ranks models by what they cost to build each day, from the start/end rows
+-- the project-wide query-stats hooks write. Models are ranked by bytes scanned
+-- where the warehouse reports it and by elapsed time otherwise (and on ties).
+--
+--     dbt compile --select model_cost_ranking
+--     # then run target/compiled/jaffle_shop/analyses/model_cost_ranking.sql
+
+with events as (
+
+    select * from {{ audit_relation('model_query_stats') }}
+
+),
+
+starts as (
+
+    select invocation_id, node_id, event_at as started_at
+    from events
+    where event = 'start'
+
+),
+
+ends as (
+
+    select invocation_id, node_id, event_at as finished_at, rows_affected, bytes_scanned
+    from events
+    where event = 'end'
+
+),
+
+model_runs as (
+
+    select
+        ends.node_id,
+        cast({{ dbt.date_trunc('day', 'starts.started_at') }} as date) as run_date,
+        {{ dbt.datediff('starts.started_at', 'ends.finished_at', 'millisecond') }} / 1000.0 as elapsed_seconds,
+        ends.rows_affected,
+        ends.bytes_scanned
+
+    from ends
+
+    inner join starts
+        on ends.invocation_id = starts.invocation_id
+        and ends.node_id = starts.node_id
+
+),
+
+daily as (
+
+    select
+        node_id,
+        run_date,
+        count(*) as runs,
+        sum(elapsed_seconds) as total_elapsed_seconds,
+        max(elapsed_seconds) as max_elapsed_seconds,
+        sum(rows_affected) as rows_affected,
+        sum(bytes_scanned) as bytes_scanned
+
+    from model_runs
+
+    group by 1, 2
+
+),
+
+final as (
+
+    select
+        *,
+        rank() over (
+            partition by run_date
+            order by coalesce(bytes_scanned, 0) desc, total_elapsed_seconds desc
+        ) as cost_rank
+
+    from daily
+
+)
+
+select * from final
+order by run_date desc, cost_rank
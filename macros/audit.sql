@@ -0,0 +1,58 @@
+{% macro audit_relation(identifier) %}
+    {#- Audit tables live next to the models, in a `<target schema>_audit` schema. -#}
+    {{ return(api.Relation.create(
+        database=target.database,
+        schema=target.schema ~ '_audit',
+        identifier=identifier
+    )) }}
+{% endmacro %}
+
+
+{% macro audit_table_columns() %}
+    {{ return({
+        'test_watermarks': [
+            ('test_name', dbt.type_string()),
+            ('watermark', dbt.type_timestamp()),
+            ('recorded_at', dbt.type_timestamp()),
+        ],
+        'lifetime_value_drift': [
+            ('customer_id', dbt.type_int()),
+            ('drift', dbt.type_numeric()),
+            ('detected_at', dbt.type_timestamp()),
+        ],
+        'model_query_stats': [
+            ('invocation_id', dbt.type_string()),
+            ('node_id', dbt.type_string()),
+            ('event', dbt.type_string()),
+            ('event_at', dbt.type_timestamp()),
+            ('query_id', dbt.type_string()),
+            ('rows_affected', dbt.type_bigint()),
+            ('bytes_scanned', dbt.type_bigint()),
+        ],
+    }) }}
+{% endmacro %}
+
+
+{% macro create_audit_schema() %}
+    {#-
+        on-run-start hook, listed before the create_audit_table hooks. Plain
+        DDL rather than adapter.create_schema(): `dbt compile` renders the
+        hooks on several threads at once, and schema creation done while
+        rendering raced on a fresh DuckDB database.
+    -#}
+    create schema if not exists {{ audit_relation('').without_identifier() }}
+{% endmacro %}
+
+
+{% macro create_audit_table(identifier) %}
+    {#-
+        DDL for one audit table. Used as an on-run-start hook (one hook per
+        table, since some warehouses reject multi-statement hooks) so the
+        table exists before any model, test or hook writes to it.
+    -#}
+    create table if not exists {{ audit_relation(identifier) }} (
+        {%- for name, data_type in audit_table_columns()[identifier] %}
+        {{ name }} {{ data_type }}{{ "," if not loop.last }}
+        {%- endfor %}
+    )
+{% endmacro %}
@@ -0,0 +1,34 @@
+{% macro backfill_window() %}
+    {#-
+        The [backfill_start, backfill_end) order_date window requested through
+        vars, or none outside of a backfill. scripts/backfill.py splits a long
+        range into chunks and runs one dbt invocation per chunk.
+    -#}
+    {% set start = var('backfill_start', none) %}
+    {% set end = var('backfill_end', none) %}
+    {% if start is none and end is none %}
+        {{ return(none) }}
+    {% endif %}
+    {% if start is none or end is none %}
+        {{ exceptions.raise_compiler_error("backfill_start and backfill_end must be set together") }}
+    {% endif %}
+    {{ return([start, end]) }}
+{% endmacro %}
+
+
+{% macro backfill_filter(column) %}
+    {%- set window = backfill_window() -%}
+    {{ column }} >= cast('{{ window[0] }}' as date) and {{ column }} < cast('{{ window[1] }}' as date)
+{%- endmacro %}
+
+
+{% macro backfill_delete_window(column) %}
+    {#-
+        Pre-hook that clears the backfill window from an existing table, so a
+        chunk rebuilds its rows from scratch however often it is rerun, and
+        chunks covering other windows can write to the table at the same time.
+    -#}
+    {% if execute and backfill_window() and adapter.get_relation(this.database, this.schema, this.identifier) %}
+        delete from {{ this }} where {{ backfill_filter(column) }}
+    {% endif %}
+{% endmacro %}
@@ -0,0 +1,26 @@
+{% macro check_mart_materializations(allowed=['table', 'incremental']) %}
+    {#-
+        Raises a compilation error when a model under models/mart/ is configured
+        with a materialization outside `allowed`, so a mis-scoped config can't
+        silently turn a mart into a view stacked on views over raw sources.
+        Wired up as an on-run-start hook; can also be invoked on its own with
+        `dbt run-operation check_mart_materializations`.
+    -#}
+    {% if execute %}
+        {% set offenders = [] %}
+        {% for node in graph.nodes.values() %}
+            {% if node.resource_type == 'model'
+                and node.package_name == project_name
+                and node.fqn[1] == 'mart'
+                and node.config.materialized not in allowed %}
+                {% do offenders.append(node.name ~ ' (' ~ node.config.materialized ~ ')') %}
+            {% endif %}
+        {% endfor %}
+        {% if offenders %}
+            {{ exceptions.raise_compiler_error(
+                "Mart models must be materialized as one of [" ~ allowed | join(', ') ~ "], "
+                ~ "but these are not: " ~ offenders | join(', ')
+            ) }}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
@@ -0,0 +1,26 @@
+{% macro create_index(relation, columns) %}
+    {#-
+        Post-hook helper that indexes `relation` on `columns` where the adapter
+        has secondary indexes. Renders to nothing elsewhere, so it can be used
+        in configs shared by every target.
+    -#}
+    {{ return(adapter.dispatch('create_index')(relation, columns)) }}
+{% endmacro %}
+
+{% macro default__create_index(relation, columns) %}
+{% endmacro %}
+
+{% macro postgres__create_index(relation, columns) %}
+    create index if not exists {{ relation.identifier }}__{{ columns | join('__') }}__idx
+    on {{ relation }} ({{ columns | join(', ') }})
+{% endmacro %}
+
+{% macro duckdb__create_index(relation, columns) %}
+    create index if not exists {{ relation.identifier }}__{{ columns | join('__') }}__idx
+    on {{ relation }} ({{ columns | join(', ') }})
+{% endmacro %}
+
+{% macro snowflake__create_index(relation, columns) %}
+    {#- no secondary indexes on Snowflake; a clustering key is the closest equivalent -#}
+    alter table {{ relation }} cluster by ({{ columns | join(', ') }})
+{% endmacro %}
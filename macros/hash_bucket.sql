@@ -0,0 +1,24 @@
+{% macro hash_bucket(expression, buckets) %}
+    {#-
+        Deterministic bucket number in [0, buckets) for `expression`. Equal
+        values always land in the same bucket, so filtering on the bucket
+        samples whole keys rather than individual rows.
+    -#}
+    {{ return(adapter.dispatch('hash_bucket')(expression, buckets)) }}
+{% endmacro %}
+
+{% macro default__hash_bucket(expression, buckets) %}
+    abs(mod(hash({{ expression }}), {{ buckets }}))
+{% endmacro %}
+
+{% macro duckdb__hash_bucket(expression, buckets) %}
+    (hash({{ expression }}) % {{ buckets }})
+{% endmacro %}
+
+{% macro bigquery__hash_bucket(expression, buckets) %}
+    abs(mod(farm_fingerprint(cast({{ expression }} as string)), {{ buckets }}))
+{% endmacro %}
+
+{% macro postgres__hash_bucket(expression, buckets) %}
+    abs(mod(hashtext(cast({{ expression }} as text)), {{ buckets }}))
+{% endmacro %}
@@ -0,0 +1,124 @@
+{#-
+    Helpers for microbatch models built from an incrementally maintained model
+    of the same grain. A run only rebuilds the batches of its lookback window,
+    so a late or restated row of `source` whose event time is older than that
+    would never reach {{ this }}; microbatch_catch_up() replaces those rows
+    before the first batch runs.
+-#}
+
+{% macro _unfiltered(relation) %}
+    {#- a ref in a batch's context is filtered to that batch's days; read all of it -#}
+    {{ return(api.Relation.create(
+        database=relation.database, schema=relation.schema, identifier=relation.identifier
+    )) }}
+{% endmacro %}
+
+
+{% macro microbatch_catch_up(source, unique_key, watermarks, compare_columns) %}
+    {#-
+        Pre-hook for a model selecting the columns of `source`: replaces the
+        rows of {{ this }} whose `source` row changed since the last run, from
+        the model's `begin` on. Those are the rows of `source` with any of the
+        `watermarks` columns above its maximum in {{ this }}, so only the
+        changed rows are read. The maxima are read once, before the delete,
+        so the insert adds back exactly the deleted and the newly loaded rows. Reconciliation runs (the ltv_reconcile var)
+        instead compare `compare_columns` of every row and add the missing
+        ones. Microbatch models run their pre-hooks once, before the first
+        batch, so the batches can't raise the maxima first.
+    -#}
+    {% if not execute or not is_incremental() %}
+        {{ return('') }}
+    {% endif %}
+    {% set source = _unfiltered(source) %}
+    {% set columns = adapter.get_columns_in_relation(this) | map(attribute='name') | list %}
+    {% set begin = (config.get('begin') | string)[:10] %}
+    {#-
+        Columns `source` gained since the last run are added here rather than
+        by on_schema_change in the first batch: DuckDB can't alter a table
+        that the same transaction has already changed. A new watermark column
+        is null throughout, so that run replaces every row once.
+    -#}
+    {% set missing = [] %}
+    {% for column in adapter.get_columns_in_relation(source) %}
+        {% if column.name not in columns %}
+            {% do missing.append(column) %}
+        {% endif %}
+    {% endfor %}
+    {% if missing %}
+        {% do alter_relation_add_remove_columns(
+            adapter.get_relation(this.database, this.schema, this.identifier), missing, []
+        ) %}
+        {% set columns = columns + (missing | map(attribute='name') | list) %}
+    {% endif %}
+    {% if var('ltv_reconcile', false) %}
+        {% set changed %}
+            select source.{{ unique_key }}
+            from {{ source }} as source
+            left join {{ this }} as target
+                on target.{{ unique_key }} = source.{{ unique_key }}
+            where source.{{ config.get('event_time') }} >= cast('{{ begin }}' as date)
+            and (
+                target.{{ unique_key }} is null
+                {%- for column in compare_columns %}
+                or source.{{ column }} is distinct from target.{{ column }}
+                {%- endfor %}
+            )
+        {% endset %}
+    {% else %}
+        {% set select_maxima %}
+            select
+            {%- for column in watermarks %}
+                coalesce(max({{ column }}), cast('1900-01-01' as timestamp)) as {{ column }}{{ ',' if not loop.last }}
+            {%- endfor %}
+            from {{ this }}
+        {% endset %}
+        {% set maxima = run_query(select_maxima).rows[0] %}
+        {% set changed %}
+            select {{ unique_key }}
+            from {{ source }}
+            where {{ config.get('event_time') }} >= cast('{{ begin }}' as date)
+            and (
+                {%- for column in watermarks %}
+                {{ 'or ' if not loop.first }}{{ column }} > cast('{{ maxima[loop.index0] }}' as timestamp)
+                {%- endfor %}
+            )
+        {% endset %}
+    {% endif %}
+    {% do run_query("delete from " ~ this ~ " where " ~ unique_key ~ " in (" ~ changed ~ ")") %}
+    insert into {{ this }} ({{ columns | join(', ') }})
+    select {{ columns | join(', ') }}
+    from {{ source }}
+    where {{ unique_key }} in ({{ changed }})
+{% endmacro %}
+
+
+{% macro microbatch_history(relation) %}
+    {#-
+        The `relation` a microbatch model reads, with the first batch of a
+        first build or full refresh widened to every row from the model's
+        `begin` up to the end of that batch: the bulk of history loads in one
+        query, and daily batches only cover the days after it. Such runs have
+        to start at --event-time-start (with --event-time-end), e.g. the
+        current day, or they would run one batch per day since `begin`.
+    -#}
+    {% if not execute or not model.batch or is_incremental() %}
+        {{ return(relation) }}
+    {% endif %}
+    {% set begin = (config.get('begin') | string)[:10] %}
+    {% set event_time_start = invocation_args_dict.get('event_time_start') %}
+    {% if event_time_start is none %}
+        {{ exceptions.raise_compiler_error(
+            "A first build or full refresh of " ~ this.identifier ~ " runs one batch per day from "
+            ~ begin ~ "; bound it with --event-time-start and --event-time-end, e.g. "
+            ~ "today and tomorrow. Its first batch loads every earlier row in one query."
+        ) }}
+    {% endif %}
+    {% if (model.batch.event_time_start | string)[:10] != (event_time_start | string)[:10] %}
+        {{ return(relation) }}
+    {% endif %}
+    {% set event_time = config.get('event_time') %}
+    {{ return(
+        "(select * from " ~ _unfiltered(relation) ~ " where " ~ event_time ~ " >= '" ~ begin
+        ~ "' and " ~ event_time ~ " < '" ~ model.batch.event_time_end ~ "')"
+    ) }}
+{% endmacro %}
@@ -0,0 +1,32 @@
+{% macro physical_layout(partition_by=none, cluster_by=[]) %}
+    {#-
+        Model config for partitioning on a date column and clustering on a few
+        keys, in whatever form the current adapter understands. Spread it into
+        a model's config so one declaration works on every target:
+
+            {{ config(materialized='table', **physical_layout('order_date', ['customer_id'])) }}
+    -#}
+    {{ return(adapter.dispatch('physical_layout')(partition_by, cluster_by)) }}
+{% endmacro %}
+
+{% macro default__physical_layout(partition_by, cluster_by) %}
+    {#- DuckDB and Postgres have no declarative partitioning or clustering in dbt; min/max zone maps do the pruning -#}
+    {{ return({}) }}
+{% endmacro %}
+
+{% macro snowflake__physical_layout(partition_by, cluster_by) %}
+    {#- micro-partitions replace explicit partitions; lead the clustering key with the date so range filters prune -#}
+    {% set keys = ([partition_by] if partition_by else []) + cluster_by %}
+    {{ return({'cluster_by': keys} if keys else {}) }}
+{% endmacro %}
+
+{% macro bigquery__physical_layout(partition_by, cluster_by) %}
+    {% set layout = {} %}
+    {% if partition_by %}
+        {% do layout.update({'partition_by': {'field': partition_by, 'data_type': 'date', 'granularity': 'day'}}) %}
+    {% endif %}
+    {% if cluster_by %}
+        {% do layout.update({'cluster_by': cluster_by}) %}
+    {% endif %}
+    {{ return(layout) }}
+{% endmacro %}
@@ -0,0 +1,21 @@
+{% test primary_key(model, column_name, sample_percent=none) %}
+    {#-
+        `unique` and `not_null` in one pass: a single GROUP BY finds both
+        duplicated keys and the (single) null group. With `sample_percent`
+        only keys whose hash falls in that percentage of buckets are checked;
+        every copy of a sampled key is included, so duplicates among the
+        sampled keys are still caught, but duplicates of other keys are not.
+    -#}
+    select
+        {{ column_name }},
+        count(*) as n_records
+
+    from {{ model }}
+    {% if sample_percent is not none %}
+    where {{ hash_bucket(column_name, 100) }} < {{ sample_percent }}
+       or {{ column_name }} is null
+    {% endif %}
+
+    group by {{ column_name }}
+    having count(*) > 1 or {{ column_name }} is null
+{% endtest %}
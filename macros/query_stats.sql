@@ -0,0 +1,101 @@
+{#-
+    Per-model execution stats, applied to every model as project-wide pre- and
+    post-hooks in dbt_project.yml. Each model run writes a `start` and an `end`
+    row to the model_query_stats audit table; analyses/model_cost_ranking.sql
+    pairs them up into elapsed time.
+
+    Rows are only ever inserted, never updated, so models running on
+    different threads don't contend for the table. The event time is taken
+    when the hook is rendered rather than from the warehouse clock, because
+    on Postgres current_timestamp is frozen for the whole transaction that
+    the pre-hook, the model and the post-hook share.
+-#}
+
+{% macro record_query_start() %}
+    insert into {{ audit_relation('model_query_stats') }} (invocation_id, node_id, event, event_at)
+    values ('{{ invocation_id }}', '{{ model.unique_id }}', 'start', {{ _query_stats_now() }})
+{% endmacro %}
+
+
+{% macro record_query_stats() %}
+    {% set stats = {'query_id': 'null', 'rows_affected': 'null', 'bytes_scanned': 'null'} %}
+    {% if execute %}
+        {% set main = load_result('main') %}
+        {% if main and main.response %}
+            {% do stats.update(query_stats(main.response)) %}
+        {% endif %}
+    {% endif %}
+    insert into {{ audit_relation('model_query_stats') }}
+        (invocation_id, node_id, event, event_at, query_id, rows_affected, bytes_scanned)
+    select
+        '{{ invocation_id }}',
+        '{{ model.unique_id }}',
+        'end',
+        {{ _query_stats_now() }},
+        {{ stats['query_id'] }},
+        {{ stats['rows_affected'] }},
+        {{ stats['bytes_scanned'] }}
+{% endmacro %}
+
+
+{% macro _query_stats_now() %}
+    cast('{{ modules.datetime.datetime.utcnow().isoformat(sep=" ") }}' as {{ dbt.type_timestamp() }})
+{% endmacro %}
+
+
+{% macro _sql_literal(value) %}
+    {{ return("'" ~ value ~ "'" if value is not none else 'null') }}
+{% endmacro %}
+
+
+{% macro query_stats(response) %}
+    {#-
+        SQL expressions for query_id, rows_affected and bytes_scanned taken
+        from the adapter response of a model's main statement; 'null' for
+        whatever the adapter doesn't expose.
+    -#}
+    {{ return(adapter.dispatch('query_stats')(response)) }}
+{% endmacro %}
+
+{% macro default__query_stats(response) %}
+    {% set rows = response.rows_affected %}
+    {{ return({
+        'query_id': _sql_literal(response.query_id),
+        'rows_affected': rows if rows is not none and rows >= 0 else 'null',
+    }) }}
+{% endmacro %}
+
+{% macro bigquery__query_stats(response) %}
+    {% set stats = default__query_stats(response) %}
+    {% do stats.update({
+        'query_id': _sql_literal(response.job_id),
+        'bytes_scanned': response.bytes_processed if response.bytes_processed is not none else 'null',
+    }) %}
+    {{ return(stats) }}
+{% endmacro %}
+
+{% macro snowflake__query_stats(response) %}
+    {#- the response has no byte counts; look the statement up in this session's query history -#}
+    {% set stats = default__query_stats(response) %}
+    {% if response.query_id %}
+        {% do stats.update({'bytes_scanned':
+            "(select bytes_scanned from table(information_schema.query_history_by_session())"
+            ~ " where query_id = '" ~ response.query_id ~ "')"
+        }) %}
+    {% endif %}
+    {{ return(stats) }}
+{% endmacro %}
+
+{% macro duckdb__query_stats(response) %}
+    {#-
+        DuckDB reports neither a query id nor rows affected, so record the
+        built relation's row count instead (for incremental models that is
+        the whole table, not just the merged rows). Views are left out:
+        counting them would run the view.
+    -#}
+    {% set stats = default__query_stats(response) %}
+    {% if stats['rows_affected'] == 'null' and config.get('materialized') in ('table', 'incremental') %}
+        {% do stats.update({'rows_affected': '(select count(*) from ' ~ this ~ ')'}) %}
+    {% endif %}
+    {{ return(stats) }}
+{% endmacro %}
@@ -0,0 +1,12 @@
+{% macro record_lifetime_value_drift() %}
+    {#-
+        Post-hook for reconciliation runs of int_customer_lifetime_value: keeps
+        the customers whose fully recomputed lifetime value differed from the
+        incrementally maintained one, e.g. because a payment was deleted at
+        the source, which no _batched_at high-water mark can detect.
+    -#}
+    insert into {{ audit_relation('lifetime_value_drift') }} (customer_id, drift, detected_at)
+    select customer_id, reconciliation_drift, {{ dbt.current_timestamp() }}
+    from {{ this }}
+    where reconciliation_drift <> 0
+{% endmacro %}
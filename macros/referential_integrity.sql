@@ -0,0 +1,33 @@
+{% test referential_integrity(model, column_name, to, field, max_orphans=100) %}
+    {#-
+        Scalable replacement for dbt's `relationships` test. Instead of
+        materializing a full left join it runs a `not exists` anti-join, which
+        warehouses execute as a hash anti-join, and stops after `max_orphans`
+        orphaned keys: one orphan already fails the test, so there is no point
+        in finding all of them. Honours dbt's `where` config, e.g. to only
+        check recently loaded rows.
+    -#}
+    with child as (
+
+        select {{ column_name }} as key_value
+        from {{ model }}
+        where {{ column_name }} is not null
+
+    ),
+
+    parent as (
+
+        select {{ field }} as key_value
+        from {{ to }}
+
+    )
+
+    select child.key_value as orphaned_key
+    from child
+    where not exists (
+        select 1
+        from parent
+        where parent.key_value = child.key_value
+    )
+    limit {{ max_orphans }}
+{% endtest %}
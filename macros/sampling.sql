@@ -0,0 +1,22 @@
+{% macro sample_buckets() %}
+    {#-
+        Number of customer buckets the staging models sample one of, or none
+        for a full build. Set with --vars '{sample_buckets: 20}'; targets listed
+        in the sampled_targets var default to 10. 0 or 1 turns sampling off.
+    -#}
+    {% set buckets = var('sample_buckets', none) %}
+    {% if buckets is none and target.name in var('sampled_targets', []) %}
+        {% set buckets = 10 %}
+    {% endif %}
+    {{ return(buckets | int if buckets and buckets | int > 1 else none) }}
+{% endmacro %}
+
+
+{% macro sample_filter(customer_id) %}
+    {#-
+        Predicate keeping the sampled customers. Every staging model samples on
+        the customer id, so each kept customer keeps all of their orders and
+        payments and the joins downstream stay complete.
+    -#}
+    {{ hash_bucket(customer_id, sample_buckets()) }} = 0
+{%- endmacro %}
@@ -0,0 +1,84 @@
+{% macro collect_freshness(source, loaded_at_field, filter) %}
+    {#-
+        Overrides dbt's collect_freshness so `dbt source freshness` doesn't have
+        to scan max(loaded_at_field) over every source table. Depending on the
+        `source_freshness_mode` var it tries, in order:
+
+          metadata   the table's last-modified time from the warehouse's own
+                     metadata (Snowflake, BigQuery), then the loader watermark
+                     table, then the column scan
+          watermark  the loader watermark table, then the column scan
+          scan       dbt's default max(loaded_at_field) query
+
+        Freshness checks with a `filter` always scan, since metadata can't
+        answer for a subset of the table.
+    -#}
+    {% set mode = var('source_freshness_mode', 'metadata') %}
+    {% set candidates = [] %}
+    {% if not filter %}
+        {% if mode == 'metadata' %}
+            {% do candidates.append(source_last_modified_sql(source)) %}
+        {% endif %}
+        {% if mode in ('metadata', 'watermark') %}
+            {% do candidates.append(loader_watermark_sql(source)) %}
+        {% endif %}
+    {% endif %}
+
+    {% for loaded_at_sql in candidates if loaded_at_sql %}
+        {% call statement('collect_freshness', fetch_result=True, auto_begin=False) -%}
+            select
+                ({{ loaded_at_sql }}) as max_loaded_at,
+                {{ current_timestamp() }} as snapshotted_at
+        {%- endcall %}
+        {% set result = load_result('collect_freshness') %}
+        {% if result.table.rows[0][0] is not none %}
+            {{ return(result) }}
+        {% endif %}
+    {% endfor %}
+
+    {{ return(adapter.dispatch('collect_freshness', 'dbt')(source, loaded_at_field, filter)) }}
+{% endmacro %}
+
+
+{% macro source_last_modified_sql(source) %}
+    {{ return(adapter.dispatch('source_last_modified_sql')(source)) }}
+{% endmacro %}
+
+{% macro default__source_last_modified_sql(source) %}
+    {{ return(none) }}
+{% endmacro %}
+
+{% macro snowflake__source_last_modified_sql(source) %}
+    select last_altered
+    from {{ source.database }}.information_schema.tables
+    where table_schema = upper('{{ source.schema }}')
+      and table_name = upper('{{ source.identifier }}')
+{% endmacro %}
+
+{% macro bigquery__source_last_modified_sql(source) %}
+    select timestamp_millis(last_modified_time)
+    from `{{ source.database }}.{{ source.schema }}.__TABLES__`
+    where table_id = '{{ source.identifier }}'
+{% endmacro %}
+
+
+{% macro loader_watermark_sql(source) %}
+    {#- max(loaded_at) the loader recorded for `source`, or none if the watermark table doesn't exist -#}
+    {% set watermark_node = graph.sources.values()
+        | selectattr('source_name', 'equalto', 'loader')
+        | selectattr('name', 'equalto', 'load_watermarks')
+        | first %}
+    {% set watermark_relation = adapter.get_relation(
+        database=watermark_node.database,
+        schema=watermark_node.schema,
+        identifier=watermark_node.identifier
+    ) %}
+    {% if watermark_relation is none %}
+        {{ return(none) }}
+    {% endif %}
+    {{ return(
+        "select max(loaded_at) from " ~ watermark_relation
+        ~ " where lower(table_schema) = lower('" ~ source.schema ~ "')"
+        ~ " and lower(table_name) = lower('" ~ source.identifier ~ "')"
+    ) }}
+{% endmacro %}
@@ -0,0 +1,50 @@
+{% macro test_watermark(test_name) %}
+    {#-
+        The source high-water mark recorded the last time `test_name` passed,
+        or 1900-01-01 if it never has. Tests compare it with a loaded-at column
+        to only evaluate rows that arrived since then.
+    -#}
+    (
+        select coalesce(max(watermark), cast('1900-01-01' as {{ dbt.type_timestamp() }}))
+        from {{ audit_relation('test_watermarks') }}
+        where test_name = '{{ test_name }}'
+    )
+{% endmacro %}
+
+
+{% macro record_test_watermarks(results) %}
+    {#-
+        on-run-end hook. For every passing test configured with
+        meta: {watermark: {source: [<source>, <table>], column: <loaded-at column>}},
+        records the source's current max(column) as the test's new watermark.
+        Rows loaded while the invocation was running can land below the
+        recorded mark; the weekly full-mode run (vars: {test_mode: full})
+        covers them.
+    -#}
+    {% if execute %}
+        {% set selects = [] %}
+        {% for result in results
+            if result.node.resource_type == 'test'
+            and result.status == 'pass'
+            and result.node.config.meta.get('watermark') %}
+            {% set watermark = result.node.config.meta['watermark'] %}
+            {% set source_node = graph.sources.values()
+                | selectattr('source_name', 'equalto', watermark['source'][0])
+                | selectattr('name', 'equalto', watermark['source'][1])
+                | first %}
+            {% set source_relation = api.Relation.create(
+                database=source_node.database,
+                schema=source_node.schema,
+                identifier=source_node.identifier
+            ) %}
+            {% do selects.append(
+                "select '" ~ result.node.name ~ "', max(" ~ watermark['column'] ~ "), "
+                ~ dbt.current_timestamp() ~ " from " ~ source_relation
+            ) %}
+        {% endfor %}
+        {% if selects %}
+            insert into {{ audit_relation('test_watermarks') }} (test_name, watermark, recorded_at)
+            {{ selects | join('\nunion all\n') }}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
@@ -0,0 +1,88 @@
+{% set reconcile = var('ltv_reconcile', false) %}
+{% set backfill = backfill_window() and not reconcile %}
+
+{{
+    config(
+        materialized='incremental',
+        unique_key='customer_id',
+        on_schema_change='append_new_columns',
+        post_hook=(["{{ record_lifetime_value_drift() }}"] if reconcile else [])
+    )
+}}
+
+with order_payments as (
+
+    select * from {{ref('int_order_payments')}}
+
+),
+
+{% if backfill %}
+-- backfill: re-derive every customer with an order in the window
+touched_customers as (
+
+    select distinct customer_id
+    from order_payments
+    where {{ backfill_filter('order_date') }}
+
+),
+{% elif is_incremental() and not reconcile %}
+-- customers with an order whose payments changed since the last run (new
+-- payments, refunds and restated payments all arrive with a fresh _batched_at)
+-- or with an order loaded since then, whose payments may have arrived first
+touched_customers as (
+
+    select distinct customer_id
+    from order_payments
+    where last_payment_batched_at > (
+        select coalesce(max(last_payment_batched_at), cast('1900-01-01' as timestamp)) from {{ this }}
+    )
+    or order_loaded_at > (
+        select coalesce(max(last_order_loaded_at), cast('1900-01-01' as timestamp)) from {{ this }}
+    )
+
+),
+{% endif %}
+
+-- lifetime value is re-derived from every order of a touched customer rather
+-- than adjusted by the changed orders alone, so a restated order total
+-- replaces its old amount instead of being counted twice
+customer_payments as (
+
+    select
+        customer_id,
+        sum(amount) as lifetime_value,
+        sum(number_of_payments) as number_of_payments,
+        max(last_payment_batched_at) as last_payment_batched_at,
+        max(order_loaded_at) as last_order_loaded_at
+
+    from order_payments
+    {% if backfill or (is_incremental() and not reconcile) %}
+    where customer_id in (select customer_id from touched_customers)
+    {% endif %}
+
+    group by customer_id
+
+),
+
+final as (
+
+    select
+        customer_payments.customer_id,
+        customer_payments.lifetime_value,
+        customer_payments.number_of_payments,
+        customer_payments.last_payment_batched_at,
+        customer_payments.last_order_loaded_at,
+        {% if is_incremental() and reconcile %}
+        customer_payments.lifetime_value - coalesce(previous.lifetime_value, 0) as reconciliation_drift
+        {% else %}
+        cast(null as {{ dbt.type_numeric() }}) as reconciliation_drift
+        {% endif %}
+
+    from customer_payments
+    {% if is_incremental() and reconcile %}
+    left join {{ this }} as previous using (customer_id)
+    {% endif %}
+
+)
+
+select * from final
@@ -0,0 +1,57 @@
+{{
+    config(
+        materialized='incremental',
+        unique_key='customer_id',
+        on_schema_change='append_new_columns'
+    )
+}}
+
+with orders as (
+
+    select * from {{ref('stg_orders')}}
+
+),
+
+{% if backfill_window() %}
+-- backfill: re-aggregate every customer with an order in the window
+touched_customers as (
+
+    select customer_id
+    from orders
+    where {{ backfill_filter('order_date') }}
+
+),
+{% elif is_incremental() %}
+-- only customers with an order loaded since the last run are re-aggregated;
+-- everyone else keeps the row already in the table
+touched_customers as (
+
+    select customer_id
+    from orders
+    where _etl_loaded_at > (
+        select coalesce(max(last_order_loaded_at), cast('1900-01-01' as timestamp)) from {{ this }}
+    )
+
+),
+{% endif %}
+
+customer_orders as (
+
+    select
+        customer_id,
+
+        min(order_date) as first_order_date,
+        max(order_date) as most_recent_order_date,
+        count(order_id) as number_of_orders,
+        max(_etl_loaded_at) as last_order_loaded_at
+
+    from orders
+    {% if backfill_window() or is_incremental() %}
+    where customer_id in (select customer_id from touched_customers)
+    {% endif %}
+
+    group by customer_id
+
+)
+
+select * from customer_orders
@@ -0,0 +1,82 @@
+{% set reconcile = var('ltv_reconcile', false) %}
+{% set backfill = backfill_window() and not reconcile %}
+
+{{
+    config(
+        materialized='incremental',
+        unique_key='order_id',
+        on_schema_change='append_new_columns',
+        event_time='order_date'
+    )
+}}
+
+with payments as (
+
+    select * from {{ref('stg_payments')}}
+
+),
+
+orders as (
+
+    select * from {{ref('stg_orders')}}
+
+),
+
+{% if backfill %}
+-- backfill: re-derive every order in the window
+touched_orders as (
+
+    select order_id
+    from orders
+    where {{ backfill_filter('order_date') }}
+
+),
+{% elif is_incremental() and not reconcile %}
+-- orders with a payment batched since the last run, plus orders not loaded yet
+touched_orders as (
+
+    select order_id
+    from payments
+    where _batched_at > (
+        select coalesce(max(last_payment_batched_at), cast('1900-01-01' as timestamp)) from {{ this }}
+    )
+
+    union
+
+    select order_id
+    from orders
+    where order_id not in (select order_id from {{ this }})
+
+),
+{% endif %}
+
+-- every payment of a touched order is re-aggregated, so a restated payment
+-- replaces its old amount instead of being added to it
+order_payments as (
+
+    select
+        orders.order_id,
+        orders.customer_id,
+        orders.order_date,
+        orders._etl_loaded_at as order_loaded_at,
+        coalesce(sum(payments.amount), 0) as amount,
+        count(payments.payment_id) as number_of_payments,
+        {%- for method in payment_methods() %}
+        coalesce(sum(case when payments.payment_method = '{{ method }}' then payments.amount end), 0)
+            as {{ method }}_amount,
+        {%- endfor %}
+        min(payments.created_at) as first_payment_at,
+        max(payments.created_at) as last_payment_at,
+        max(payments._batched_at) as last_payment_batched_at
+
+    from orders
+    left join payments using (order_id)
+    {% if backfill or (is_incremental() and not reconcile) %}
+    where orders.order_id in (select order_id from touched_orders)
+    {% endif %}
+
+    group by 1, 2, 3, 4
+
+)
+
+select * from order_payments
@@ -1,33 +1,21 @@
+{{ config(materialized='table', **physical_layout(cluster_by=['customer_id'])) }}
+
 with customers as (
 
    select * from {{ref('stg_customer')}}
 
 ),
 
-orders as (
+customer_order_stats as (
 
-    select * from {{ref('stg_orders')}}
+    select * from {{ref('int_customer_order_stats')}}
 
 ),
 
-customer_orders as (
-
-    select
-        customer_id,
-
-        min(order_date) as first_order_date,
-        max(order_date) as most_recent_order_date,
-        count(order_id) as number_of_orders
+customer_lifetime_value as (
 
-    from orders
-
-    group by customer_id
-
-),
+    select * from {{ref('int_customer_lifetime_value')}}
 
-fact_orders as (
-    select customer_id,sum(AMOUNT) as lifetime_value  from {{ref('fact_order')}}
-    group by ALL
 ),
 
 final as (
@@ -36,14 +24,14 @@ final as (
         customers.customer_id,
         customers.first_name,
         customers.last_name,
-        customer_orders.first_order_date,
-        customer_orders.most_recent_order_date,
-        coalesce(customer_orders.number_of_orders, 0) as number_of_orders,
-        coalesce(fact_orders.lifetime_value,0) as lifetime_value
+        customer_order_stats.first_order_date,
+        customer_order_stats.most_recent_order_date,
+        coalesce(customer_order_stats.number_of_orders, 0) as number_of_orders,
+        coalesce(customer_lifetime_value.lifetime_value,0) as lifetime_value
     from customers
 
-    left join customer_orders using (customer_id)
-    left join fact_orders using (customer_id)
+    left join customer_order_stats using (customer_id)
+    left join customer_lifetime_value using (customer_id)
 )
 
 select * from final
\ No newline at end of file
@@ -1,15 +1,61 @@
-with payments as (
+-- one row per order, with its payments pre-aggregated in int_order_payments;
+-- the payment detail is in fact_payment
+--
+-- Built in daily order_date batches (microbatch): a run rebuilds the last
+-- fact_order_lookback_days days of orders plus today, each day as its own
+-- delete+insert, and dbt filters int_order_payments to the batch's days
+-- through its event_time. A failed day doesn't discard the others;
+-- `dbt retry` reruns only the failed ones. A first build or full refresh must
+-- pass --event-time-start / --event-time-end; its first batch loads every
+-- order since begin up to the batch's end in one query. Before the first
+-- batch, the pre-hook replaces any older order whose payments were batched,
+-- or which was loaded, after the table's latest (a late or restated payment,
+-- an order loaded late).
+--
+-- Batches run one after another on DuckDB: concurrent batches wait for a
+-- free thread and never finish a --threads 1 run.
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='microbatch',
+        event_time='order_date',
+        batch_size='day',
+        lookback=var('fact_order_lookback_days', 14),
+        begin='2018-01-01',
+        unique_key=('order_id' if target.type == 'postgres' else none),
+        concurrent_batches=(false if target.type == 'duckdb' else none),
+        on_schema_change='append_new_columns',
+        pre_hook="{{ microbatch_catch_up(ref('int_order_payments'), 'order_id',
+            ['last_payment_batched_at', 'order_loaded_at'],
+            ['amount', 'number_of_payments', 'last_payment_batched_at']) }}",
+        **physical_layout(partition_by='order_date', cluster_by=['customer_id'])
+    )
+}}
+
+with order_payments as (
+
+    select * from {{ microbatch_history(ref('int_order_payments')) }}
 
-select * from {{ source('stripe','payment') }}
-),
-orders as (
-    select * from {{ref('stg_orders')}}
 ),
-final_order as (
-select  orders.order_id as order_id,
-        orders.customer_id as customer_id,
-        payments.AMOUNT  
-from orders left join payments on payments.orderid=orders.order_id 
+
+final as (
+
+    select
+        order_id,
+        customer_id,
+        order_date,
+        amount,
+        number_of_payments,
+        {%- for method in payment_methods() %}
+        {{ method }}_amount,
+        {%- endfor %}
+        first_payment_at,
+        last_payment_at,
+        last_payment_batched_at,
+        order_loaded_at
+
+    from order_payments
 
 )
-Select * from final_order
\ No newline at end of file
+
+select * from final
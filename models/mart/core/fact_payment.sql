@@ -0,0 +1,86 @@
+-- one row per payment; fact_order has one row per order
+{% set reconcile = var('ltv_reconcile', false) %}
+
+-- an order's payments are replaced as a whole (delete+insert on order_id), so
+-- a payment deleted or voided at the source disappears with the next change
+-- to its order. BigQuery has no delete+insert; there payments merge on
+-- payment_id and deleted ones stay. Reconciliation runs (the ltv_reconcile
+-- var) re-emit every order, after dropping the payments of orders left with
+-- none, which a delete+insert of the emitted orders would miss.
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy=('merge' if target.type == 'bigquery' else 'delete+insert'),
+        unique_key=('payment_id' if target.type == 'bigquery' else 'order_id'),
+        on_schema_change='append_new_columns',
+        pre_hook=[
+            "{{ backfill_delete_window('order_date') }}",
+            "{% if is_incremental() and var('ltv_reconcile', false) %}"
+            "delete from {{ this }} where order_id not in ("
+            "select order_id from {{ ref('int_order_payments') }} where number_of_payments > 0)"
+            "{% endif %}"
+        ],
+        **physical_layout(partition_by='order_date', cluster_by=['customer_id'])
+    )
+}}
+
+with payments as (
+
+    select * from {{ref('stg_payments')}}
+
+),
+
+order_payments as (
+
+    select * from {{ref('int_order_payments')}}
+
+),
+
+payment_methods as (
+
+    select * from {{ref('payment_methods')}}
+
+),
+
+{% if is_incremental() and not backfill_window() and not reconcile %}
+-- orders to (re)load: every order whose payments were batched after the
+-- current high-water mark, plus orders with payments that have not been
+-- loaded at all yet (a payment can arrive before its order). All of their
+-- payments are re-emitted so restated payments replace the loaded ones.
+-- int_order_payments keeps one row per order, so this doesn't scan the payments.
+changed_orders as (
+
+    select order_id
+    from order_payments
+    where last_payment_batched_at > (
+        select coalesce(max(_batched_at), cast('1900-01-01' as timestamp)) from {{ this }}
+    )
+    or (number_of_payments > 0 and order_id not in (select order_id from {{ this }}))
+
+),
+{% endif %}
+
+final as (
+
+    select
+        payments.payment_id,
+        order_payments.order_id,
+        order_payments.customer_id,
+        order_payments.order_date,
+        payments.payment_method,
+        payment_methods.payment_category,
+        payments.amount,
+        payments._batched_at
+
+    from order_payments
+    inner join payments on payments.order_id = order_payments.order_id
+    left join payment_methods on payment_methods.payment_method = payments.payment_method
+    {% if backfill_window() %}
+    where {{ backfill_filter('order_payments.order_date') }}
+    {% elif is_incremental() and not reconcile %}
+    where order_payments.order_id in (select order_id from changed_orders)
+    {% endif %}
+
+)
+
+select * from final
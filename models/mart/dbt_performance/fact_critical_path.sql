@@ -0,0 +1,152 @@
+-- Longest chain of dependent nodes in each invocation, weighted by how long
+-- each node took. Nothing downstream of a node can start before it finishes,
+-- so no number of threads makes a run shorter than this path.
+-- Paths are enumerated from every entry node, which is cheap for a DAG this
+-- size but grows with the number of distinct paths.
+
+with recursive run_results as (
+
+    select * from {{ ref('stg_dbt_run_results') }}
+    -- run hooks execute serially on the main thread, outside the worker pool
+    where resource_type <> 'operation'
+
+),
+
+manifest_edges as (
+
+    select * from {{ ref('stg_dbt_manifest_edges') }}
+
+),
+
+invocations as (
+
+    select * from {{ ref('stg_dbt_invocations') }}
+
+),
+
+-- edges between two nodes that both ran in the invocation
+executed_edges as (
+
+    select
+        manifest_edges.invocation_id,
+        manifest_edges.parent_id,
+        manifest_edges.child_id
+
+    from manifest_edges
+
+    inner join run_results as parents
+        on manifest_edges.invocation_id = parents.invocation_id
+        and manifest_edges.parent_id = parents.node_id
+
+    inner join run_results as children
+        on manifest_edges.invocation_id = children.invocation_id
+        and manifest_edges.child_id = children.node_id
+
+),
+
+entry_nodes as (
+
+    select
+        invocation_id,
+        node_id,
+        execution_time
+
+    from run_results
+
+    where not exists (
+        select 1 from executed_edges
+        where executed_edges.invocation_id = run_results.invocation_id
+            and executed_edges.child_id = run_results.node_id
+    )
+
+),
+
+paths as (
+
+    select
+        invocation_id,
+        node_id,
+        execution_time as path_seconds,
+        1 as path_nodes,
+        cast(node_id as {{ dbt.type_string() }}) as path
+
+    from entry_nodes
+
+    union all
+
+    select
+        paths.invocation_id,
+        run_results.node_id,
+        paths.path_seconds + run_results.execution_time,
+        paths.path_nodes + 1,
+        cast({{ dbt.concat(['paths.path', "' > '", 'run_results.node_id']) }} as {{ dbt.type_string() }})
+
+    from paths
+
+    inner join executed_edges
+        on paths.invocation_id = executed_edges.invocation_id
+        and paths.node_id = executed_edges.parent_id
+
+    inner join run_results
+        on executed_edges.invocation_id = run_results.invocation_id
+        and executed_edges.child_id = run_results.node_id
+
+),
+
+longest_paths as (
+
+    select
+        invocation_id,
+        path_seconds,
+        path_nodes,
+        path,
+        row_number() over (
+            partition by invocation_id order by path_seconds desc
+        ) as path_rank
+
+    from paths
+
+),
+
+node_seconds as (
+
+    select
+        invocation_id,
+        count(*) as nodes_executed,
+        sum(execution_time) as total_node_seconds
+
+    from run_results
+
+    group by 1
+
+),
+
+final as (
+
+    select
+        invocations.invocation_id,
+        invocations.generated_at,
+        invocations.command,
+        invocations.threads,
+        invocations.elapsed_time,
+        node_seconds.nodes_executed,
+        node_seconds.total_node_seconds,
+        longest_paths.path_seconds as critical_path_seconds,
+        longest_paths.path_nodes as critical_path_nodes,
+        longest_paths.path as critical_path,
+        -- work / span: more threads than this cannot be kept busy
+        node_seconds.total_node_seconds
+            / nullif(longest_paths.path_seconds, 0) as average_parallelism
+
+    from invocations
+
+    inner join node_seconds
+        on invocations.invocation_id = node_seconds.invocation_id
+
+    inner join longest_paths
+        on invocations.invocation_id = longest_paths.invocation_id
+        and longest_paths.path_rank = 1
+
+)
+
+select * from final
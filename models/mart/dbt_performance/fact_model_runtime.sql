@@ -0,0 +1,66 @@
+with run_results as (
+
+    select * from {{ ref('stg_dbt_run_results') }}
+
+),
+
+manifest_nodes as (
+
+    select * from {{ ref('stg_dbt_manifest_nodes') }}
+
+),
+
+invocations as (
+
+    select * from {{ ref('stg_dbt_invocations') }}
+
+),
+
+model_runs as (
+
+    select
+        run_results.run_result_id,
+        run_results.invocation_id,
+        invocations.generated_at,
+        run_results.node_id,
+        manifest_nodes.node_name,
+        manifest_nodes.materialized,
+        run_results.status,
+        run_results.thread_id,
+        run_results.execution_time,
+        run_results.rows_affected,
+        run_results.compiled_sql_hash
+
+    from run_results
+
+    inner join manifest_nodes
+        on run_results.invocation_id = manifest_nodes.invocation_id
+        and run_results.node_id = manifest_nodes.node_id
+
+    inner join invocations
+        on run_results.invocation_id = invocations.invocation_id
+
+    where manifest_nodes.resource_type = 'model'
+
+),
+
+final as (
+
+    select
+        *,
+        lag(execution_time) over (
+            partition by node_id order by generated_at
+        ) as previous_execution_time,
+        avg(execution_time) over (
+            partition by node_id order by generated_at
+            rows between 9 preceding and current row
+        ) as rolling_avg_execution_time,
+        compiled_sql_hash <> lag(compiled_sql_hash) over (
+            partition by node_id order by generated_at
+        ) as is_sql_changed
+
+    from model_runs
+
+)
+
+select * from final
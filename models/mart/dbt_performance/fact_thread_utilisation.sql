@@ -0,0 +1,57 @@
+with run_results as (
+
+    select * from {{ ref('stg_dbt_run_results') }}
+    -- run hooks execute serially on the main thread, outside the worker pool
+    where resource_type <> 'operation'
+
+),
+
+invocations as (
+
+    select * from {{ ref('stg_dbt_invocations') }}
+
+),
+
+thread_work as (
+
+    select
+        invocation_id,
+        thread_id,
+        count(*) as nodes_executed,
+        sum(execution_time) as busy_seconds
+
+    from run_results
+
+    group by 1, 2
+
+),
+
+final as (
+
+    select
+        {{ dbt.concat(['thread_work.invocation_id', "'|'", 'thread_work.thread_id']) }} as thread_utilisation_id,
+        thread_work.invocation_id,
+        invocations.generated_at,
+        thread_work.thread_id,
+        thread_work.nodes_executed,
+        thread_work.busy_seconds,
+        invocations.elapsed_time,
+        thread_work.busy_seconds / nullif(invocations.elapsed_time, 0) as thread_utilisation,
+        invocations.threads,
+        count(*) over (partition by thread_work.invocation_id) as threads_used,
+        -- share of the configured thread-seconds spent running nodes
+        sum(thread_work.busy_seconds) over (partition by thread_work.invocation_id)
+            / nullif(
+                coalesce(invocations.threads, count(*) over (partition by thread_work.invocation_id))
+                * invocations.elapsed_time,
+                0
+            ) as run_utilisation
+
+    from thread_work
+
+    inner join invocations
+        on thread_work.invocation_id = invocations.invocation_id
+
+)
+
+select * from final
@@ -0,0 +1,16 @@
+with invocations as (
+
+    select
+        invocation_id,
+        generated_at,
+        dbt_version,
+        command,
+        target,
+        threads,
+        elapsed_time
+
+    from {{ source('dbt_artifacts','invocations') }}
+
+)
+
+select * from invocations
@@ -0,0 +1,12 @@
+with manifest_edges as (
+
+    select
+        invocation_id,
+        parent_id,
+        child_id
+
+    from {{ source('dbt_artifacts','manifest_edges') }}
+
+)
+
+select * from manifest_edges
@@ -0,0 +1,18 @@
+with manifest_nodes as (
+
+    select
+        {{ dbt.concat(['invocation_id', "'|'", 'unique_id']) }} as manifest_node_id,
+        invocation_id,
+        unique_id as node_id,
+        resource_type,
+        name as node_name,
+        package_name,
+        original_file_path,
+        materialized,
+        checksum
+
+    from {{ source('dbt_artifacts','manifest_nodes') }}
+
+)
+
+select * from manifest_nodes
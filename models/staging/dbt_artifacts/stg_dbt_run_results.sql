@@ -0,0 +1,20 @@
+with run_results as (
+
+    select
+        {{ dbt.concat(['invocation_id', "'|'", 'unique_id']) }} as run_result_id,
+        invocation_id,
+        unique_id as node_id,
+        {{ dbt.split_part('unique_id', "'.'", 1) }} as resource_type,
+        status,
+        thread_id,
+        execution_time,
+        execute_started_at,
+        execute_completed_at,
+        rows_affected,
+        compiled_sql_hash
+
+    from {{ source('dbt_artifacts','run_results') }}
+
+)
+
+select * from run_results
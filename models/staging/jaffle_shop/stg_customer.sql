@@ -6,6 +6,9 @@ with customers as (
         last_name
 
     from {{ source('jaffle_shop','customers') }}
+    {% if sample_buckets() %}
+    where {{ sample_filter('id') }}
+    {% endif %}
 
 )
 select * from customers
\ No newline at end of file
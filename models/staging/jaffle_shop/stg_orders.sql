@@ -4,9 +4,13 @@ with orders as (
         id as order_id,
         user_id as customer_id,
         order_date,
-        status
+        status,
+        _etl_loaded_at
 
     from {{ source('jaffle_shop','orders') }}
+    {% if sample_buckets() %}
+    where {{ sample_filter('user_id') }}
+    {% endif %}
 
 )
 
@@ -1,5 +1,23 @@
 with payments as (
 
-select * from {{ source('stripe','payment') }}
+    select
+        id as payment_id,
+        orderid as order_id,
+        paymentmethod as payment_method,
+        status,
+        {{ cents_to_dollars('amount') }} as amount,
+        created as created_at,
+        _batched_at
+
+    from {{ source('stripe','payment') }}
+    {% if sample_buckets() %}
+    -- payments carry no customer id; keep those of the sampled customers' orders
+    where orderid in (
+        select id from {{ source('jaffle_shop','orders') }}
+        where {{ sample_filter('user_id') }}
+    )
+    {% endif %}
+
 )
-select * from payments
+
+select * from payments
\ No newline at end of file
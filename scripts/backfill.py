@@ -0,0 +1,193 @@
+"""Rebuild the order facts and the customer aggregates over an order_date range in chunks.
+
+A single full refresh over all history can time out on the warehouse. This
+splits ``[--start, --end)`` into ``--chunk-days`` windows and runs one dbt
+invocation of the order-grain models per window with ``backfill_start`` /
+``backfill_end`` vars. In that mode each model only processes its window, and
+fact_payment first deletes the window's rows, so any chunk can be rerun and
+chunks for different windows can run at the same time. fact_order is a
+microbatch model; the same window is passed as ``--event-time-start`` /
+``--event-time-end`` so the chunk rebuilds just those days' batches.
+
+The first chunk runs on its own so it can create the tables (with
+``--full-refresh`` it replaces them, which is how a rebuild after a logic
+change starts). The remaining chunks then run ``--jobs`` at a time.
+
+The customer-grain models aggregate all of a customer's orders, so they are
+not chunked: once every chunk has finished, one run re-derives the customers
+with an order in ``[--start, --end)`` from full history. With
+``--full-refresh`` the order-grain models first run once without the window
+to restore the orders outside it, and fact_order (in a single batch) and the
+customer-grain models are then rebuilt from scratch.
+
+    python scripts/backfill.py --start 2023-01-01 --end 2025-01-01 --chunk-days 30 --jobs 4
+
+DuckDB only allows one writing process per database file, so use ``--jobs 1``
+against the local targets.
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import os
+import sys
+
+from dbt_artifacts import PROFILES_DIR, DbtCommandError, first_batch_event_time_args, run_dbt
+
+DEFAULT_SELECT = "int_order_payments fact_order fact_payment"
+DEFAULT_CUSTOMER_SELECT = "int_customer_order_stats int_customer_lifetime_value"
+
+
+def chunk_windows(start, end, chunk_days):
+    """Split ``[start, end)`` into consecutive windows of at most ``chunk_days`` days."""
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be at least 1")
+    windows = []
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + datetime.timedelta(days=chunk_days), end)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def run_chunk(window, select, target, profiles_dir, full_refresh=False, exclude=None):
+    start, end = window
+    dbt_vars = {"backfill_start": start.isoformat(), "backfill_end": end.isoformat()}
+    chunk_path = os.path.join("target", "backfill", start.isoformat())
+    args = ["run", "--select", select, "--vars", json.dumps(dbt_vars),
+            "--event-time-start", start.isoformat(), "--event-time-end", end.isoformat(),
+            "--log-path", os.path.join(chunk_path, "logs")]
+    if full_refresh:
+        args.append("--full-refresh")
+    if exclude:
+        args += ["--exclude", exclude]
+    run_dbt(args, target=target, target_path=chunk_path, profiles_dir=profiles_dir, quiet=True)
+    return window
+
+
+def run_customers(window, select, order_select, target, profiles_dir, full_refresh=False):
+    """Re-derive the customer-grain models once, after every chunk has finished.
+
+    Incrementally, the customers with an order in the whole backfill window
+    are re-aggregated. After a ``--full-refresh`` the first chunk replaced the
+    order-grain tables with its window only, so they are topped up first.
+    fact_order can't find the orders it is missing without a full scan, so it
+    is rebuilt, in one batch, together with the customer-grain models.
+    """
+    start, end = window
+    final_path = os.path.join("target", "backfill", "customers")
+    log_args = ["--log-path", os.path.join(final_path, "logs")]
+    if full_refresh:
+        rebuild = select
+        top_up = ["run", "--select", order_select]
+        if "fact_order" in order_select.split():
+            rebuild += " fact_order"
+            top_up += ["--exclude", "fact_order"]
+        run_dbt(top_up + log_args,
+                target=target, target_path=final_path, profiles_dir=profiles_dir, quiet=True)
+        run_dbt(["run", "--select", rebuild, "--full-refresh"] + first_batch_event_time_args()
+                + log_args,
+                target=target, target_path=final_path, profiles_dir=profiles_dir, quiet=True)
+    else:
+        dbt_vars = {"backfill_start": start.isoformat(), "backfill_end": end.isoformat()}
+        run_dbt(["run", "--select", select, "--vars", json.dumps(dbt_vars)] + log_args,
+                target=target, target_path=final_path, profiles_dir=profiles_dir, quiet=True)
+
+
+def customers_command(args):
+    """The dbt command that does run_customers' work, for finishing by hand."""
+    options = " --profiles-dir {}".format(args.profiles_dir)
+    if args.target:
+        options += " --target {}".format(args.target)
+    if args.full_refresh:
+        return ("dbt run --select {0} --exclude fact_order{2}"
+                " && dbt run --select {1} fact_order --full-refresh {3}{2}").format(
+            args.select, args.customer_select, options, " ".join(first_batch_event_time_args()))
+    return "dbt run --select {} --vars '{}'{}".format(args.customer_select, json.dumps(
+        {"backfill_start": args.start.isoformat(), "backfill_end": args.end.isoformat()}), options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=datetime.date.fromisoformat, required=True,
+                        help="first order_date to rebuild (inclusive), YYYY-MM-DD")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, required=True,
+                        help="order_date to stop at (exclusive), YYYY-MM-DD")
+    parser.add_argument("--chunk-days", type=int, default=30,
+                        help="days per chunk (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=4,
+                        help="chunks to run concurrently (default: %(default)s)")
+    parser.add_argument("--select", default=DEFAULT_SELECT,
+                        help="models to backfill chunk by chunk (default: %(default)s)")
+    parser.add_argument("--customer-select", default=DEFAULT_CUSTOMER_SELECT,
+                        help="customer-grain models to re-derive once after the chunks, "
+                             "'' to skip them (default: %(default)s)")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="replace the order tables with the first chunk before backfilling the "
+                             "rest, then rebuild the customer-grain models over full history")
+    parser.add_argument("--target", help="dbt target (default: the profile's default)")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR,
+                        help="dbt profiles directory (default: the project's profiles/)")
+    args = parser.parse_args(argv)
+
+    windows = chunk_windows(args.start, args.end, args.chunk_days)
+    if not windows:
+        parser.error("--start must be before --end")
+
+    def describe(window):
+        return "{} .. {}".format(*window)
+
+    # a --full-refresh rebuilds fact_order in one batch at the end instead
+    exclude = "fact_order" if args.full_refresh and args.customer_select else None
+    print("Backfilling {} chunk(s): {}".format(len(windows), args.select))
+    try:
+        run_chunk(windows[0], args.select, args.target, args.profiles_dir, args.full_refresh,
+                  exclude)
+    except DbtCommandError as error:
+        print("chunk {} failed: {}".format(describe(windows[0]), error), file=sys.stderr)
+        return 1
+    print("done  {}".format(describe(windows[0])))
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {
+            executor.submit(run_chunk, window, args.select, args.target, args.profiles_dir,
+                            exclude=exclude): window
+            for window in windows[1:]
+        }
+        for future in concurrent.futures.as_completed(futures):
+            window = futures[future]
+            try:
+                future.result()
+            except DbtCommandError:
+                failed.append(window)
+                print("FAILED {}".format(describe(window)), file=sys.stderr)
+            else:
+                print("done  {}".format(describe(window)))
+
+    if failed:
+        print("\n{} chunk(s) failed; rerun them with:".format(len(failed)), file=sys.stderr)
+        for window in sorted(failed):
+            print("  python scripts/backfill.py --start {} --end {} --chunk-days {} "
+                  "--customer-select ''".format(window[0], window[1], args.chunk_days),
+                  file=sys.stderr)
+        print("The customer-grain models were not re-derived; once the chunks are in, run:",
+              file=sys.stderr)
+        print("  " + customers_command(args), file=sys.stderr)
+        return 1
+
+    if args.customer_select:
+        try:
+            run_customers((args.start, args.end), args.customer_select, args.select,
+                          args.target, args.profiles_dir, args.full_refresh)
+        except DbtCommandError as error:
+            print("customer models failed: {}".format(error), file=sys.stderr)
+            return 1
+        print("done  {}".format(args.customer_select))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
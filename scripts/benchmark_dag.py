@@ -0,0 +1,175 @@
+"""Time every model of the DAG on a fixed local dataset and gate on regressions.
+
+The benchmark regenerates the DuckDB fixtures at a fixed scale and as-of
+timestamp, loads the seeds, full-refreshes the project against the ``bench``
+target a few times, and takes the median execution time per model from
+run_results.json.
+Rows processed come from the adapter response when the adapter reports them,
+and otherwise from counting the built relation.
+
+The medians are compared with the checked-in baseline. The script exits with
+status 1 when any model is slower than the baseline by more than
+``--max-regression`` percent (and by more than ``--noise-floor`` seconds,
+so sub-millisecond models can't fail the gate on jitter alone).
+
+    python scripts/benchmark_dag.py                    # compare with baseline
+    python scripts/benchmark_dag.py --update-baseline  # record a new baseline
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+
+import duckdb
+
+import generate_fixtures
+from dbt_artifacts import (
+    PROJECT_DIR, first_batch_event_time_args, load_artifact, node_results, rows_affected, run_dbt,
+)
+
+DEFAULT_BASELINE = os.path.join(PROJECT_DIR, "benchmarks", "baseline.json")
+BENCH_TARGET = "bench"
+BENCH_TARGET_PATH = os.path.join("target", "bench")
+BENCH_AS_OF = datetime.datetime(2024, 1, 1)
+BENCH_WAREHOUSE = os.path.join(PROJECT_DIR, "local", "bench", "jaffle_shop.duckdb")
+BENCH_RAW = os.path.join(PROJECT_DIR, "local", "bench", "raw.duckdb")
+
+
+def _count_rows(warehouse_path, relation_name):
+    with duckdb.connect(warehouse_path, read_only=True) as con:
+        con.execute("attach '{}' as raw (read_only)".format(BENCH_RAW))
+        return con.execute("select count(*) from {}".format(relation_name)).fetchone()[0]
+
+
+def bench_event_time_args():
+    """Bound microbatch models to the last day the bench fixtures have orders on.
+
+    fact_order's first batch then loads the whole order history in one query,
+    like a full refresh on any other target.
+    """
+    return first_batch_event_time_args(BENCH_AS_OF.date())
+
+
+def prepare_bench_fixtures(scale):
+    """Regenerate the bench source tables and return the env for the bench target."""
+    os.makedirs(os.path.dirname(BENCH_RAW), exist_ok=True)
+    with duckdb.connect(BENCH_RAW) as con:
+        generate_fixtures.generate(con, scale=scale, as_of=BENCH_AS_OF)
+    return {"JAFFLE_DUCKDB_PATH": BENCH_WAREHOUSE, "JAFFLE_RAW_DUCKDB_PATH": BENCH_RAW}
+
+
+def measure(scale, repeat, threads, select=None):
+    """Return ``{model_name: {"execution_time": median_seconds, "rows": n}}``."""
+    env = prepare_bench_fixtures(scale)
+    args = ["run", "--full-refresh", "--threads", str(threads)] + bench_event_time_args()
+    if select:
+        args += ["--select", select]
+
+    # the models join the seeds, which a fresh bench warehouse doesn't have yet
+    run_dbt(["seed"], target=BENCH_TARGET, target_path=BENCH_TARGET_PATH, env=env, quiet=True)
+
+    timings = {}
+    rows = {}
+    relations = {}
+    for _ in range(repeat):
+        run_dbt(args, target=BENCH_TARGET, target_path=BENCH_TARGET_PATH, env=env, quiet=True)
+        run_results = load_artifact("run_results.json", BENCH_TARGET_PATH)
+        for result in node_results(run_results):
+            name = result["unique_id"].split(".")[-1]
+            timings.setdefault(name, []).append(result["execution_time"])
+            rows[name] = rows_affected(result)
+            relations[name] = result.get("relation_name")
+
+    for name, count in rows.items():
+        if count is None and relations[name]:
+            rows[name] = _count_rows(BENCH_WAREHOUSE, relations[name])
+
+    return {
+        name: {"execution_time": round(statistics.median(times), 4), "rows": rows.get(name)}
+        for name, times in sorted(timings.items())
+    }
+
+
+def compare(baseline, current, max_regression, noise_floor):
+    """Return ``(report_lines, regressed_model_names)``."""
+    lines = ["{:<32} {:>10} {:>10} {:>8} {:>12}".format(
+        "model", "baseline", "current", "change", "rows")]
+    regressed = []
+    for name in sorted(set(baseline) | set(current)):
+        before = baseline.get(name)
+        after = current.get(name)
+        if after is None:
+            lines.append("{:<32} {:>10.3f} {:>10} {:>8}".format(
+                name, before["execution_time"], "-", "removed"))
+            continue
+        if before is None:
+            lines.append("{:<32} {:>10} {:>10.3f} {:>8} {:>12}".format(
+                name, "-", after["execution_time"], "new", after["rows"] or ""))
+            continue
+
+        delta = after["execution_time"] - before["execution_time"]
+        change = delta / before["execution_time"] * 100 if before["execution_time"] else 0.0
+        flag = ""
+        if change > max_regression and delta > noise_floor:
+            regressed.append(name)
+            flag = "  REGRESSED"
+        if before.get("rows") is not None and after["rows"] != before["rows"]:
+            flag += "  (rows {} -> {})".format(before["rows"], after["rows"])
+        lines.append("{:<32} {:>10.3f} {:>10.3f} {:>+7.1f}% {:>12}{}".format(
+            name, before["execution_time"], after["execution_time"], change,
+            after["rows"] if after["rows"] is not None else "", flag))
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10,
+                        help="fixture scale factor (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per model; the median is kept (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="dbt threads; 1 keeps per-model timings comparable (default: %(default)s)")
+    parser.add_argument("--select", help="dbt selection to benchmark (default: every model)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--max-regression", type=float, default=25.0,
+                        help="allowed slowdown per model, in percent (default: %(default)s)")
+    parser.add_argument("--noise-floor", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many seconds (default: %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the measurements to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    current = measure(args.scale, args.repeat, args.threads, args.select)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as handle:
+            json.dump({"scale": args.scale, "repeat": args.repeat, "threads": args.threads,
+                       "models": current}, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print("Wrote baseline for {} models to {}".format(len(current), args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        parser.error("no baseline at {}; record one with --update-baseline".format(args.baseline))
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    if baseline.get("scale") != args.scale:
+        parser.error("baseline was recorded at scale {}, not {}".format(
+            baseline.get("scale"), args.scale))
+
+    lines, regressed = compare(baseline["models"], current, args.max_regression, args.noise_floor)
+    print("\n".join(lines))
+    if regressed:
+        print("\n{} model(s) regressed by more than {:.0f}%: {}".format(
+            len(regressed), args.max_regression, ", ".join(regressed)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
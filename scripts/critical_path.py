@@ -0,0 +1,312 @@
+"""Find the DAG's critical path, recommend a thread count and flag serializing edges.
+
+Reads the node graph from ``manifest.json`` and per-node timings either from
+the run history that ``scripts/load_dbt_artifacts.py`` keeps in the raw DuckDB
+file (median of the last ``--runs`` successful runs) or from one or more
+``run_results.json`` files. With those it reports:
+
+* the critical path: the chain of dependent nodes with the largest total
+  time. No thread count can make a run shorter than it.
+* the makespan of a simulated run at each thread count, scheduling ready
+  nodes longest-remaining-path first, and the smallest ``threads`` setting
+  within ``--tolerance`` percent of the best one.
+* the dependency edges on the critical path whose removal would shorten it
+  by at least ``--min-gain`` seconds. An edge between two mart models is
+  marked, since a mart usually only needs another mart's data for something
+  it could read from upstream instead.
+
+    python scripts/critical_path.py
+    python scripts/critical_path.py --run-results target/run_results.json --build
+"""
+
+import argparse
+import collections
+import heapq
+import json
+import math
+import os
+import statistics
+import sys
+
+from dbt_artifacts import PROJECT_DIR, artifact_path
+
+DEFAULT_HISTORY = os.path.join(PROJECT_DIR, "local", "raw.duckdb")
+RUN_TYPES = ("model", "seed", "snapshot")
+
+
+class Graph:
+    """Nodes with durations and parent -> child edges."""
+
+    def __init__(self, durations, edges):
+        self.durations = dict(durations)
+        self.children = collections.defaultdict(set)
+        self.parents = collections.defaultdict(set)
+        for parent, child in edges:
+            self.children[parent].add(child)
+            self.parents[child].add(parent)
+
+    def edges(self):
+        return [(parent, child) for parent, children in self.children.items()
+                for child in children]
+
+    def topological_order(self):
+        remaining = {node: len(self.parents[node]) for node in self.durations}
+        ready = sorted(node for node, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for child in sorted(self.children[node]):
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.durations):
+            raise ValueError("the graph has a cycle")
+        return order
+
+    def critical_path(self, skip_edge=None):
+        """Return ``(seconds, [node, ...])`` for the longest weighted path."""
+        finish = {}
+        previous = {}
+        for node in self.topological_order():
+            start, via = 0.0, None
+            for parent in self.parents[node]:
+                if (parent, node) != skip_edge and finish[parent] > start:
+                    start, via = finish[parent], parent
+            finish[node] = start + self.durations[node]
+            previous[node] = via
+        if not finish:
+            return 0.0, []
+        node = max(finish, key=finish.get)
+        seconds, path = finish[node], []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return seconds, path[::-1]
+
+    def remaining_path(self):
+        """Longest path from each node to the end of the graph, the node included."""
+        remaining = {}
+        for node in reversed(self.topological_order()):
+            tail = max((remaining[child] for child in self.children[node]), default=0.0)
+            remaining[node] = self.durations[node] + tail
+        return remaining
+
+    def simulate(self, threads):
+        """Makespan of a run on ``threads`` workers, longest remaining path first."""
+        priority = self.remaining_path()
+        waiting = {node: len(self.parents[node]) for node in self.durations}
+        ready = [(-priority[node], node) for node, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        running = []
+        clock = 0.0
+        while ready or running:
+            while ready and len(running) < threads:
+                _, node = heapq.heappop(ready)
+                heapq.heappush(running, (clock + self.durations[node], node))
+            clock, node = heapq.heappop(running)
+            for child in self.children[node]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    heapq.heappush(ready, (-priority[child], child))
+        return clock
+
+
+def manifest_graph(manifest, durations, build=False):
+    """Build the run graph for the manifest's nodes of the executed resource types.
+
+    With ``build``, tests are included and, as ``dbt build`` does, each test
+    also blocks the children of the nodes it tests.
+
+    Ephemeral models don't run on their own; their SQL is inlined into their
+    children, so each child depends on the ephemeral model's parents instead.
+    """
+    resource_types = RUN_TYPES + (("test",) if build else ())
+    ephemeral = {unique_id: node for unique_id, node in manifest["nodes"].items()
+                 if node.get("config", {}).get("materialized") == "ephemeral"}
+    nodes = {unique_id: node for unique_id, node in manifest["nodes"].items()
+             if node["resource_type"] in resource_types
+             and node.get("config", {}).get("enabled", True)
+             and unique_id not in ephemeral}
+
+    def run_parents(node, seen):
+        for parent in node.get("depends_on", {}).get("nodes", []):
+            if parent in nodes:
+                yield parent
+            elif parent in ephemeral and parent not in seen:
+                seen.add(parent)
+                yield from run_parents(ephemeral[parent], seen)
+
+    edges = set()
+    for unique_id, node in nodes.items():
+        for parent in run_parents(node, set()):
+            edges.add((parent, unique_id))
+    if build:
+        children = collections.defaultdict(set)
+        for parent, child in edges:
+            children[parent].add(child)
+        for unique_id, node in nodes.items():
+            if node["resource_type"] != "test":
+                continue
+            for tested in node.get("depends_on", {}).get("nodes", []):
+                for child in children.get(tested, ()):
+                    if nodes[child]["resource_type"] != "test":
+                        edges.add((unique_id, child))
+
+    return Graph({unique_id: durations.get(unique_id, 0.0) for unique_id in nodes}, edges)
+
+
+def durations_from_run_results(paths):
+    """Median execution_time per node over the given run_results.json files."""
+    samples = collections.defaultdict(list)
+    for path in paths:
+        with open(path) as handle:
+            for result in json.load(handle)["results"]:
+                if result["status"] in ("success", "pass"):
+                    samples[result["unique_id"]].append(result["execution_time"])
+    return {node: statistics.median(times) for node, times in samples.items()}
+
+
+def durations_from_history(path, runs):
+    """Median execution_time per node over its last ``runs`` successful loaded runs.
+
+    Empty when ``path`` holds no loaded history, e.g. a raw database that
+    load_dbt_artifacts.py has never written to.
+    """
+    import duckdb
+
+    with duckdb.connect(path, read_only=True) as con:
+        loaded = con.execute(
+            """
+            select count(*) from information_schema.tables
+            where table_schema = 'dbt_artifacts' and table_name in ('run_results', 'invocations')
+            """
+        ).fetchone()[0]
+        if loaded < 2:
+            return {}
+        rows = con.execute(
+            """
+            with ranked as (
+                select
+                    run_results.unique_id,
+                    run_results.execution_time,
+                    row_number() over (
+                        partition by run_results.unique_id
+                        order by invocations.generated_at desc
+                    ) as recency
+                from dbt_artifacts.run_results
+                inner join dbt_artifacts.invocations using (invocation_id)
+                where run_results.status in ('success', 'pass')
+            )
+            select unique_id, median(execution_time)
+            from ranked
+            where recency <= ?
+            group by 1
+            """,
+            [runs],
+        ).fetchall()
+    return dict(rows)
+
+
+def is_mart(manifest, unique_id):
+    fqn = manifest["nodes"][unique_id].get("fqn", [])
+    return len(fqn) > 1 and fqn[1] == "mart"
+
+
+def serializing_edges(graph, manifest, min_gain):
+    """Edges on the critical path whose removal shortens it by ``min_gain`` seconds or more."""
+    seconds, path = graph.critical_path()
+    flagged = []
+    for parent, child in zip(path, path[1:]):
+        shorter, _ = graph.critical_path(skip_edge=(parent, child))
+        gain = seconds - shorter
+        if gain >= min_gain:
+            mart_to_mart = is_mart(manifest, parent) and is_mart(manifest, child)
+            flagged.append((gain, parent, child, mart_to_mart))
+    return sorted(flagged, reverse=True)
+
+
+def recommend_threads(graph, max_threads, tolerance):
+    """Return ``(threads, {threads: makespan})``: the fewest threads within tolerance of the best."""
+    makespans = {threads: graph.simulate(threads) for threads in range(1, max_threads + 1)}
+    best = min(makespans.values())
+    for threads in sorted(makespans):
+        if makespans[threads] <= best * (1 + tolerance / 100.0):
+            return threads, makespans
+    return max_threads, makespans
+
+
+def _short(unique_id):
+    return unique_id.split(".", 2)[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--manifest", default=artifact_path("manifest.json"),
+                        help="manifest.json to read the DAG from (default: target/manifest.json)")
+    parser.add_argument("--run-results", action="append",
+                        help="run_results.json to take timings from; repeat to take the median "
+                             "over several (default: the loaded history, else target/run_results.json)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY,
+                        help="DuckDB file written by load_dbt_artifacts.py (default: local/raw.duckdb)")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="recent runs per node to take the median of (default: %(default)s)")
+    parser.add_argument("--build", action="store_true",
+                        help="model `dbt build`: include tests, which block their models' children")
+    parser.add_argument("--max-threads", type=int, default=16,
+                        help="largest thread count to simulate (default: %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=5.0,
+                        help="percent slower than the best makespan still accepted (default: %(default)s)")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="seconds an edge must add to the critical path to be flagged "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest) as handle:
+        manifest = json.load(handle)
+
+    if args.run_results:
+        durations = durations_from_run_results(args.run_results)
+    else:
+        durations = {}
+        if os.path.exists(args.history):
+            durations = durations_from_history(args.history, args.runs)
+        if not durations:
+            durations = durations_from_run_results([artifact_path("run_results.json")])
+
+    graph = manifest_graph(manifest, durations, build=args.build)
+    untimed = sorted(node for node in graph.durations if node not in durations)
+    if untimed:
+        print("{} node(s) have no timings and count as 0s, e.g. {}\n".format(
+            len(untimed), _short(untimed[0])))
+
+    seconds, path = graph.critical_path()
+    work = sum(graph.durations.values())
+    print("Critical path: {:.2f}s of {:.2f}s total node time over {} nodes".format(
+        seconds, work, len(graph.durations)))
+    for node in path:
+        print("  {:>8.2f}s  {}".format(graph.durations[node], _short(node)))
+
+    threads, makespans = recommend_threads(graph, args.max_threads, args.tolerance)
+    print("\nSimulated run time by thread count:")
+    for count in sorted(makespans):
+        marker = "  <- recommended" if count == threads else ""
+        print("  {:>3} threads  {:>8.2f}s{}".format(count, makespans[count], marker))
+    if seconds:
+        print("\nAverage parallelism (total / critical path): {:.1f}; "
+              "threads beyond {} mostly wait.".format(work / seconds, math.ceil(work / seconds)))
+    print("Recommended: threads: {}".format(threads))
+
+    flagged = serializing_edges(graph, manifest, args.min_gain)
+    print("\nEdges serializing the critical path (gain if removed):")
+    if not flagged:
+        print("  none above {:.2f}s".format(args.min_gain))
+    for gain, parent, child, mart_to_mart in flagged:
+        print("  {:>8.2f}s  {} -> {}{}".format(
+            gain, _short(parent), _short(child),
+            "  (mart depends on mart; read upstream instead?)" if mart_to_mart else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
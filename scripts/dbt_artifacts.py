@@ -0,0 +1,80 @@
+"""Helpers shared by the scripts that drive dbt and read its target/ artifacts."""
+
+import datetime
+import json
+import os
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_DIR = os.path.join(PROJECT_DIR, "profiles")
+
+
+def first_batch_event_time_args(as_of=None):
+    """``--event-time-start`` / ``--event-time-end`` for a full refresh of the microbatch models.
+
+    They bound the run to the single day of ``as_of`` (default: today). The
+    first batch of a first build or full refresh loads everything before its
+    end in one query, so this builds all of fact_order with one batch instead
+    of one per day since its ``begin``.
+    """
+    start = as_of or datetime.date.today()
+    end = start + datetime.timedelta(days=1)
+    return ["--event-time-start", start.isoformat(), "--event-time-end", end.isoformat()]
+
+
+class DbtCommandError(RuntimeError):
+    """Raised when a dbt invocation exits with a non-zero status."""
+
+
+def run_dbt(args, target=None, target_path=None, profiles_dir=PROFILES_DIR,
+            env=None, quiet=False):
+    """Run ``dbt <args>`` in the project directory and return the exit code.
+
+    ``target_path`` keeps the artifacts of separate invocations apart; it is
+    resolved relative to the project directory like dbt's own setting.
+    """
+    command = ["dbt"] + list(args)
+    if target:
+        command += ["--target", target]
+    if target_path:
+        command += ["--target-path", target_path]
+    if profiles_dir:
+        command += ["--profiles-dir", profiles_dir]
+
+    process_env = dict(os.environ)
+    process_env.update(env or {})
+    completed = subprocess.run(
+        command,
+        cwd=PROJECT_DIR,
+        env=process_env,
+        stdout=subprocess.DEVNULL if quiet else None,
+    )
+    if completed.returncode != 0:
+        raise DbtCommandError(
+            "`{}` exited with status {}".format(" ".join(command), completed.returncode)
+        )
+    return completed.returncode
+
+
+def artifact_path(name, target_path="target"):
+    return os.path.join(PROJECT_DIR, target_path, name)
+
+
+def load_artifact(name, target_path="target"):
+    with open(artifact_path(name, target_path)) as handle:
+        return json.load(handle)
+
+
+def node_results(run_results, resource_types=("model",)):
+    """Yield the entries of a run_results.json payload for the given resource types."""
+    for result in run_results["results"]:
+        if result["unique_id"].split(".", 1)[0] in resource_types:
+            yield result
+
+
+def rows_affected(result):
+    """Rows reported by the adapter for one result, or None if it reports none."""
+    rows = (result.get("adapter_response") or {}).get("rows_affected")
+    if rows is None or rows < 0:
+        return None
+    return rows
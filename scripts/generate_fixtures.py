@@ -0,0 +1,214 @@
+"""Generate the raw jaffle_shop and stripe source tables into a local DuckDB file.
+
+The project's sources live in the ``raw`` database (``jaffle_shop.orders``,
+``jaffle_shop.customers`` and ``stripe.payment``). This script fills a DuckDB
+file with deterministic synthetic data shaped like those tables, so the local
+DuckDB targets in ``profiles/profiles.yml`` can run the whole DAG offline.
+It also writes the ``loader.load_watermarks`` bookkeeping table that source
+freshness reads.
+
+Row counts scale linearly with ``--scale``; at scale 1 there are 1,000
+customers, 10,000 orders and roughly 12,000 payments. The same scale and
+``--as-of`` timestamp always produce the same rows.
+
+    python scripts/generate_fixtures.py --scale 10
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import duckdb
+
+BASE_CUSTOMERS = 1_000
+BASE_ORDERS = 10_000
+
+# Orders are spread over this many days ending at the as-of date.
+ORDER_HISTORY_DAYS = 730
+
+DEFAULT_PATH = os.path.join("local", "raw.duckdb")
+
+FIRST_NAMES = [
+    "Michael", "Shawn", "Kathleen", "Jimmy", "Katherine", "Sarah", "Martin",
+    "Frank", "Jennifer", "Henry", "Fred", "Amy", "Kathleen", "Steve", "Teresa",
+    "Amanda", "Kimberly", "Johnny", "Virginia", "Anna", "Willie", "Sean",
+]
+
+LAST_INITIALS = [letter + "." for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+
+
+def _sql_list(values):
+    return "[" + ", ".join("'{}'".format(value) for value in values) + "]"
+
+
+def generate(con, scale=1, as_of=None):
+    """(Re)create the three source tables on ``con`` at the given scale."""
+    if scale < 1:
+        raise ValueError("scale must be a positive integer, got {!r}".format(scale))
+    as_of = as_of or datetime.datetime.now().replace(microsecond=0)
+    params = {
+        "customers": BASE_CUSTOMERS * scale,
+        "orders": BASE_ORDERS * scale,
+        "history_days": ORDER_HISTORY_DAYS,
+        "as_of": as_of,
+    }
+
+    con.execute("create schema if not exists jaffle_shop")
+    con.execute("create schema if not exists stripe")
+
+    con.execute(
+        """
+        create or replace table jaffle_shop.customers as
+        select
+            i as id,
+            {first_names}[(hash(i, 'first_name') % {n_first})::integer + 1] as first_name,
+            {last_initials}[(hash(i, 'last_name') % {n_last})::integer + 1] as last_name
+        from range(1, $customers + 1) as t(i)
+        """.format(
+            first_names=_sql_list(FIRST_NAMES),
+            n_first=len(FIRST_NAMES),
+            last_initials=_sql_list(LAST_INITIALS),
+            n_last=len(LAST_INITIALS),
+        ),
+        {"customers": params["customers"]},
+    )
+
+    # Order ids increase with order_date, and each order is loaded a few
+    # hours after it was placed, the way the upstream loader behaves.
+    con.execute(
+        """
+        create or replace table jaffle_shop.orders as
+        with numbered as (
+            select
+                i,
+                cast($as_of as date)
+                    - cast(($orders - i) * $history_days // $orders as integer) as order_date,
+                hash(i, 'status') % 100 as status_bucket
+            from range(1, $orders + 1) as t(i)
+        )
+        select
+            i as id,
+            (hash(i, 'customer') % $customers)::integer + 1 as user_id,
+            order_date,
+            case
+                when status_bucket < 70 then 'completed'
+                when status_bucket < 80 then 'shipped'
+                when status_bucket < 88 then 'placed'
+                when status_bucket < 95 then 'returned'
+                else 'return_pending'
+            end as status,
+            least(
+                cast(order_date as timestamp) + to_hours((hash(i, 'loaded') % 24)::integer),
+                cast($as_of as timestamp)
+            ) as _etl_loaded_at
+        from numbered
+        """,
+        {key: params[key] for key in ("as_of", "orders", "history_days", "customers")},
+    )
+
+    # Most orders have one payment, some are split over two or three, and a
+    # few have none yet. About 5% of payments are batched days after the order.
+    con.execute(
+        """
+        create or replace table stripe.payment as
+        with payment_counts as (
+            select
+                id as orderid,
+                _etl_loaded_at,
+                case
+                    when hash(id, 'payments') % 100 < 3 then 0
+                    when hash(id, 'payments') % 100 < 83 then 1
+                    when hash(id, 'payments') % 100 < 96 then 2
+                    else 3
+                end as n_payments
+            from jaffle_shop.orders
+        ),
+        payments as (
+            select
+                orderid,
+                _etl_loaded_at,
+                unnest(range(n_payments)) as payment_number
+            from payment_counts
+        )
+        select
+            row_number() over (order by orderid, payment_number) as id,
+            orderid,
+            case
+                when hash(orderid, payment_number, 'method') % 100 < 55 then 'credit_card'
+                when hash(orderid, payment_number, 'method') % 100 < 75 then 'bank_transfer'
+                when hash(orderid, payment_number, 'method') % 100 < 90 then 'coupon'
+                else 'gift_card'
+            end as paymentmethod,
+            case
+                when hash(orderid, payment_number, 'status') % 100 < 96 then 'success'
+                else 'fail'
+            end as status,
+            (hash(orderid, payment_number, 'amount') % 2901)::integer + 100 as amount,
+            cast(_etl_loaded_at as date) as created,
+            least(
+                _etl_loaded_at + case
+                    when hash(orderid, payment_number, 'late') % 100 < 5
+                        then to_days((hash(orderid, payment_number, 'delay') % 10)::integer + 1)
+                    else to_hours((hash(orderid, payment_number, 'delay') % 6)::integer)
+                end,
+                cast($as_of as timestamp)
+            ) as _batched_at
+        from payments
+        """,
+        {"as_of": params["as_of"]},
+    )
+
+    # The loader records one watermark row per committed load; source
+    # freshness reads these instead of scanning the loaded-at columns.
+    con.execute("create schema if not exists loader")
+    con.execute(
+        """
+        create or replace table loader.load_watermarks as
+        select 'jaffle_shop' as table_schema, 'orders' as table_name,
+               max(_etl_loaded_at) as loaded_at
+        from jaffle_shop.orders
+        union all
+        select 'jaffle_shop', 'customers', cast($as_of as timestamp)
+        union all
+        select 'stripe', 'payment', max(_batched_at)
+        from stripe.payment
+        """,
+        {"as_of": params["as_of"]},
+    )
+
+    return {
+        table: con.execute("select count(*) from {}".format(table)).fetchone()[0]
+        for table in ("jaffle_shop.customers", "jaffle_shop.orders", "stripe.payment")
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale", type=int, default=1,
+        help="row-count multiplier, e.g. 1, 10 or 100 (default: 1)",
+    )
+    parser.add_argument(
+        "--path", default=os.environ.get("JAFFLE_RAW_DUCKDB_PATH", DEFAULT_PATH),
+        help="DuckDB file to write (default: $JAFFLE_RAW_DUCKDB_PATH or %(default)s)",
+    )
+    parser.add_argument(
+        "--as-of", type=datetime.datetime.fromisoformat, default=None,
+        help="timestamp the newest rows are loaded at, ISO format (default: now)",
+    )
+    args = parser.parse_args(argv)
+
+    directory = os.path.dirname(args.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with duckdb.connect(args.path) as con:
+        counts = generate(con, scale=args.scale, as_of=args.as_of)
+
+    for table, count in counts.items():
+        print("{:<24} {:>12,} rows".format(table, count))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
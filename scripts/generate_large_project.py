@@ -0,0 +1,227 @@
+"""Clone the jaffle_shop DAG into a large synthetic project and time parse and compile.
+
+Each copy of the project's models (``models/staging/jaffle_shop``,
+``models/intermediate`` and ``models/mart/core``), its singular tests, sources,
+YAML tests and doc blocks is written next to the original under a
+``copy_NNNN`` folder, with every model, source, test and doc name suffixed so
+the copies are independent DAGs. Macros, seeds, snapshots and analyses are
+shared. The folder-level configs of ``dbt_project.yml`` therefore apply to the
+copies exactly as they do to the originals.
+
+For every ``--copies`` value the script regenerates the project and times:
+
+* ``dbt parse --no-partial-parse``  a cold parse
+* ``dbt parse``                     a partial parse after editing one model
+* ``dbt compile``                   compiling every node
+
+    python scripts/generate_large_project.py --copies 1 10 50 150
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+import duckdb
+import yaml
+
+import generate_fixtures
+from dbt_artifacts import PROJECT_DIR, run_dbt
+
+DEFAULT_OUTPUT = os.path.join(PROJECT_DIR, "local", "large_project")
+PROJECT_NAME = "large_project"
+
+CLONED_DIRS = [
+    os.path.join("models", "staging", "jaffle_shop"),
+    os.path.join("models", "intermediate"),
+    os.path.join("models", "mart", "core"),
+    "tests",
+]
+SHARED_DIRS = ["macros", "seeds", "snapshots", "analyses"]
+
+REF = re.compile(r"""\bref\(\s*(['"])(\w+)\1\s*\)""")
+SOURCE = re.compile(r"""\bsource\(\s*(['"])(\w+)\1\s*,""")
+DOC = re.compile(r"""\bdoc\(\s*(['"])(\w+)\1\s*\)""")
+DOCS_BLOCK = re.compile(r"""\{%-?\s*docs\s+(\w+)\s*-?%\}""")
+
+
+def _files(directory):
+    """Files directly inside ``directory`` (copies live in subfolders of it)."""
+    path = os.path.join(PROJECT_DIR, directory)
+    return sorted(name for name in os.listdir(path)
+                  if os.path.isfile(os.path.join(path, name)))
+
+
+def _read(path):
+    with open(path, newline="") as handle:
+        return handle.read().replace("\r\n", "\n")
+
+
+def collect_names():
+    """Return the model/test, source and doc names that every copy renames."""
+    nodes, sources, docs = set(), set(), set()
+    for directory in CLONED_DIRS:
+        for name in _files(directory):
+            text = _read(os.path.join(PROJECT_DIR, directory, name))
+            stem, extension = os.path.splitext(name)
+            if extension == ".sql":
+                nodes.add(stem)
+            elif extension == ".md":
+                docs.update(DOCS_BLOCK.findall(text))
+            elif extension == ".yml":
+                for source in (yaml.safe_load(text) or {}).get("sources", []):
+                    sources.add(source["name"])
+    return nodes, sources, docs
+
+
+def rename(text, names, suffix):
+    """Suffix the refs, source names and doc references of ``text``."""
+    nodes, sources, docs = names
+
+    def ref(match):
+        name = match.group(2)
+        return "ref('{}')".format(name + suffix if name in nodes else name)
+
+    def source(match):
+        name = match.group(2)
+        return "source('{}',".format(name + suffix if name in sources else name)
+
+    def doc(match):
+        name = match.group(2)
+        return 'doc("{}")'.format(name + suffix if name in docs else name)
+
+    def docs_block(match):
+        return "{{% docs {} %}}".format(match.group(1) + suffix)
+
+    text = REF.sub(ref, text)
+    text = SOURCE.sub(source, text)
+    text = DOC.sub(doc, text)
+    return DOCS_BLOCK.sub(docs_block, text)
+
+
+def rename_yaml(text, names, suffix):
+    nodes, sources, _ = names
+    document = yaml.safe_load(text) or {}
+    for model in document.get("models", []):
+        if model["name"] in nodes:
+            model["name"] += suffix
+    for source in document.get("sources", []):
+        # the schema defaults to the source name, which the copy changes
+        source.setdefault("schema", source["name"])
+        source["name"] += suffix
+    return rename(yaml.safe_dump(document, sort_keys=False), names, suffix)
+
+
+def write_project(output, copies):
+    """Write a project with ``copies`` copies of the DAG; return the model count."""
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    os.makedirs(output)
+
+    project = _read(os.path.join(PROJECT_DIR, "dbt_project.yml"))
+    project = re.sub(r"^name: .*$", "name: '{}'".format(PROJECT_NAME), project, flags=re.M)
+    project = re.sub(r"^(\s+)jaffle_shop:", r"\1{}:".format(PROJECT_NAME), project, flags=re.M)
+    with open(os.path.join(output, "dbt_project.yml"), "w") as handle:
+        handle.write(project)
+
+    for directory in SHARED_DIRS:
+        shutil.copytree(os.path.join(PROJECT_DIR, directory), os.path.join(output, directory))
+
+    names = collect_names()
+    models = 0
+    for copy in range(copies):
+        # the first copy keeps the original names, which snapshots and analyses use
+        suffix = "_{:04d}".format(copy) if copy else ""
+        for directory in CLONED_DIRS:
+            destination = os.path.join(output, directory)
+            if copy:
+                destination = os.path.join(destination, "copy{}".format(suffix))
+            os.makedirs(destination, exist_ok=True)
+            for name in _files(directory):
+                text = _read(os.path.join(PROJECT_DIR, directory, name))
+                stem, extension = os.path.splitext(name)
+                if extension == ".sql":
+                    text = rename(text, names, suffix)
+                    name = stem + suffix + extension
+                    models += directory != "tests"
+                elif extension == ".yml":
+                    text = rename_yaml(text, names, suffix)
+                    name = stem + suffix + extension
+                elif extension == ".md":
+                    text = rename(text, names, suffix)
+                    name = stem + suffix + extension
+                with open(os.path.join(destination, name), "w") as handle:
+                    handle.write(text)
+    return models
+
+
+def _timed(args, output, env):
+    started = time.perf_counter()
+    run_dbt(args + ["--project-dir", output], env=env, quiet=True)
+    return round(time.perf_counter() - started, 2)
+
+
+def measure(output, copies, threads, env):
+    models = write_project(output, copies)
+    timings = {"copies": copies, "models": models}
+    timings["parse"] = _timed(["parse", "--no-partial-parse"], output, env)
+
+    edited = os.path.join(output, "models", "mart", "core", "dim_customer.sql")
+    with open(edited, "a") as handle:
+        handle.write("\n-- edited to trigger a partial parse\n")
+    timings["partial_parse"] = _timed(["parse"], output, env)
+
+    # models pivoting on a seed query it while compiling
+    run_dbt(["seed", "--project-dir", output], env=env, quiet=True)
+    timings["compile"] = _timed(["compile", "--threads", str(threads)], output, env)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 50, 150],
+                        help="DAG copies to measure at, e.g. 1 10 50 150 (default: %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="directory to generate the project into; it is replaced "
+                             "(default: local/large_project)")
+    parser.add_argument("--threads", type=int, default=4,
+                        help="dbt threads for compile (default: %(default)s)")
+    parser.add_argument("--json", help="also write the timings to this JSON file")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.output) and not os.path.exists(
+            os.path.join(args.output, "dbt_project.yml")):
+        parser.error("{} exists and is not a generated project".format(args.output))
+
+    # The project compiles against its own warehouse, with a scale-1 raw
+    # database for the sources, so the real local database is left alone.
+    raw = os.path.join(args.output + "_data", "raw.duckdb")
+    os.makedirs(os.path.dirname(raw), exist_ok=True)
+    with duckdb.connect(raw) as con:
+        generate_fixtures.generate(con, scale=1)
+    env = {
+        "JAFFLE_DUCKDB_PATH": os.path.join(args.output + "_data", "warehouse.duckdb"),
+        "JAFFLE_RAW_DUCKDB_PATH": raw,
+    }
+
+    results = []
+    print("{:>7} {:>7} {:>10} {:>14} {:>10}".format(
+        "copies", "models", "parse (s)", "partial (s)", "compile (s)"))
+    for copies in args.copies:
+        timings = measure(args.output, copies, args.threads, env)
+        results.append(timings)
+        print("{copies:>7} {models:>7} {parse:>10.2f} {partial_parse:>14.2f} {compile:>10.2f}".format(
+            **timings))
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
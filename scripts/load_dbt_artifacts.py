@@ -0,0 +1,194 @@
+"""Append a dbt invocation's run_results.json and manifest.json to the raw database.
+
+dbt overwrites the artifacts in ``target/`` on every invocation. This script
+copies the interesting parts of one invocation into the ``dbt_artifacts``
+schema of the local raw DuckDB file, where the ``dbt_artifacts`` source reads
+them, so runtime history builds up across runs:
+
+* ``invocations``      one row per invocation (command, threads, wall time)
+* ``run_results``      one row per executed node (status, thread, timings,
+                       hash of the compiled SQL)
+* ``manifest_nodes``   the project's nodes as of that invocation
+* ``manifest_edges``   their ``depends_on`` edges
+
+Loading the same invocation twice replaces its rows. Run it after each dbt
+command whose history you want to keep, then build the models with the
+``dbt_artifacts_enabled`` var:
+
+    dbt build --profiles-dir profiles --target local
+    python scripts/load_dbt_artifacts.py
+    dbt build --profiles-dir profiles --target local --vars '{dbt_artifacts_enabled: true}'
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+
+import duckdb
+
+from dbt_artifacts import load_artifact
+
+DEFAULT_PATH = os.path.join("local", "raw.duckdb")
+SCHEMA = "dbt_artifacts"
+
+TABLES = {
+    "invocations": """
+        invocation_id varchar,
+        generated_at timestamp,
+        dbt_version varchar,
+        command varchar,
+        target varchar,
+        threads integer,
+        elapsed_time double
+    """,
+    "run_results": """
+        invocation_id varchar,
+        unique_id varchar,
+        status varchar,
+        thread_id varchar,
+        execution_time double,
+        execute_started_at timestamp,
+        execute_completed_at timestamp,
+        rows_affected bigint,
+        compiled_sql_hash varchar
+    """,
+    "manifest_nodes": """
+        invocation_id varchar,
+        unique_id varchar,
+        resource_type varchar,
+        name varchar,
+        package_name varchar,
+        original_file_path varchar,
+        materialized varchar,
+        checksum varchar
+    """,
+    "manifest_edges": """
+        invocation_id varchar,
+        parent_id varchar,
+        child_id varchar
+    """,
+}
+
+
+def _timestamp(value):
+    # dbt writes ISO timestamps with a trailing Z; the columns hold naive UTC.
+    return value.rstrip("Z") if value else None
+
+
+def _execute_timing(result):
+    for step in result.get("timing") or []:
+        if step["name"] == "execute":
+            return _timestamp(step.get("started_at")), _timestamp(step.get("completed_at"))
+    return None, None
+
+
+def _compiled_sql_hash(result):
+    code = result.get("compiled_code")
+    return hashlib.sha256(code.encode("utf-8")).hexdigest() if code else None
+
+
+def artifact_rows(run_results, manifest):
+    """Return ``{table: [row tuple, ...]}`` for one invocation's artifacts."""
+    metadata = run_results["metadata"]
+    invocation_id = metadata["invocation_id"]
+    args = run_results.get("args") or {}
+
+    rows = {table: [] for table in TABLES}
+    rows["invocations"].append((
+        invocation_id,
+        _timestamp(metadata.get("generated_at")),
+        metadata.get("dbt_version"),
+        args.get("which"),
+        args.get("target"),
+        args.get("threads"),
+        run_results.get("elapsed_time"),
+    ))
+
+    for result in run_results["results"]:
+        started_at, completed_at = _execute_timing(result)
+        adapter_rows = (result.get("adapter_response") or {}).get("rows_affected")
+        rows["run_results"].append((
+            invocation_id,
+            result["unique_id"],
+            result.get("status"),
+            result.get("thread_id"),
+            result.get("execution_time"),
+            started_at,
+            completed_at,
+            adapter_rows if adapter_rows is not None and adapter_rows >= 0 else None,
+            _compiled_sql_hash(result),
+        ))
+
+    nodes = dict(manifest.get("nodes") or {})
+    nodes.update(manifest.get("sources") or {})
+    for unique_id, node in sorted(nodes.items()):
+        rows["manifest_nodes"].append((
+            invocation_id,
+            unique_id,
+            node.get("resource_type"),
+            node.get("name"),
+            node.get("package_name"),
+            node.get("original_file_path"),
+            (node.get("config") or {}).get("materialized"),
+            (node.get("checksum") or {}).get("checksum"),
+        ))
+        for parent_id in sorted(set((node.get("depends_on") or {}).get("nodes") or [])):
+            rows["manifest_edges"].append((invocation_id, parent_id, unique_id))
+
+    return rows
+
+
+def load(con, run_results, manifest):
+    """Replace one invocation's rows in the ``dbt_artifacts`` tables; return row counts."""
+    invocation_id = run_results["metadata"]["invocation_id"]
+    rows = artifact_rows(run_results, manifest)
+
+    con.execute("create schema if not exists {}".format(SCHEMA))
+    for table, columns in TABLES.items():
+        con.execute("create table if not exists {}.{} ({})".format(SCHEMA, table, columns))
+
+    con.execute("begin")
+    for table in TABLES:
+        qualified = "{}.{}".format(SCHEMA, table)
+        con.execute("delete from {} where invocation_id = ?".format(qualified), [invocation_id])
+        if rows[table]:
+            placeholders = ", ".join("?" * len(rows[table][0]))
+            con.executemany(
+                "insert into {} values ({})".format(qualified, placeholders), rows[table])
+    con.execute("commit")
+    return {table: len(table_rows) for table, table_rows in rows.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-path", default="target",
+                        help="dbt target directory holding the artifacts (default: %(default)s)")
+    parser.add_argument(
+        "--path", default=os.environ.get("JAFFLE_RAW_DUCKDB_PATH", DEFAULT_PATH),
+        help="DuckDB file to append to (default: $JAFFLE_RAW_DUCKDB_PATH or %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        run_results = load_artifact("run_results.json", args.target_path)
+        manifest = load_artifact("manifest.json", args.target_path)
+    except FileNotFoundError as error:
+        parser.error("missing dbt artifact: {}".format(error.filename))
+    if run_results["metadata"]["invocation_id"] != manifest["metadata"]["invocation_id"]:
+        parser.error("run_results.json and manifest.json come from different invocations")
+
+    directory = os.path.dirname(args.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with duckdb.connect(args.path) as con:
+        counts = load(con, run_results, manifest)
+
+    print("invocation {}".format(run_results["metadata"]["invocation_id"]))
+    for table, count in counts.items():
+        print("{:<30} {:>12,} rows".format("{}.{}".format(SCHEMA, table), count))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Slim CI: build only the modified nodes and their children, deferring the rest to prod.
+
+Two steps, each a subcommand:
+
+``publish-prod``
+    Builds the project against the ``prod`` target (unless ``--skip-build``)
+    and keeps that build's manifest.json in ``--state`` (``state/prod``). This
+    is what the deploy job runs after every merge.
+
+``ci``
+    Runs ``dbt build --select state:modified+ --defer --state state/prod``
+    against the ``ci`` target. Only nodes whose files or configs differ from
+    the stored manifest are built, with everything downstream of them;
+    refs to unchanged parents such as stg_orders resolve to the prod
+    relations. A change to dim_customer.sql rebuilds dim_customer and its
+    tests and nothing else.
+
+The local ``prod`` and ``ci`` targets in ``profiles/profiles.yml`` are two
+schemas in the same DuckDB file, so the workflow runs offline:
+
+    python scripts/generate_fixtures.py
+    python scripts/slim_ci.py publish-prod
+    # edit models/mart/core/dim_customer.sql
+    python scripts/slim_ci.py ci
+
+Arguments after ``--`` are passed on to dbt. A first build of fact_order
+(the first publish-prod, or a ci run that modifies it) has to be bounded with
+``--event-time-start`` / ``--event-time-end``, e.g. today and tomorrow (see
+the README):
+
+    python scripts/slim_ci.py publish-prod -- --event-time-start 2026-10-18 --event-time-end 2026-10-19
+"""
+
+import argparse
+import os
+import shutil
+import sys
+
+from dbt_artifacts import (
+    PROFILES_DIR, PROJECT_DIR, DbtCommandError, artifact_path, load_artifact,
+    node_results, run_dbt,
+)
+
+DEFAULT_STATE = os.path.join(PROJECT_DIR, "state", "prod")
+PROD_TARGET_PATH = os.path.join("target", "prod")
+CI_TARGET_PATH = os.path.join("target", "ci")
+
+
+def publish_prod(state_dir, target, profiles_dir, skip_build=False, dbt_args=()):
+    """Build prod (or only parse it) and store its manifest in ``state_dir``."""
+    command = ["parse"] if skip_build else ["build"]
+    run_dbt(command + list(dbt_args), target=target, target_path=PROD_TARGET_PATH,
+            profiles_dir=profiles_dir)
+    os.makedirs(state_dir, exist_ok=True)
+    destination = os.path.join(state_dir, "manifest.json")
+    shutil.copyfile(artifact_path("manifest.json", PROD_TARGET_PATH), destination)
+    return destination
+
+
+def run_ci(state_dir, target, profiles_dir, select, full_refresh=False, dbt_args=()):
+    """Build the modified nodes against ``target``; return the run's results."""
+    if not os.path.exists(os.path.join(state_dir, "manifest.json")):
+        raise FileNotFoundError(
+            "no production manifest in {}; run `publish-prod` first".format(state_dir))
+    args = ["build", "--select", select, "--defer", "--state", state_dir]
+    if full_refresh:
+        args.append("--full-refresh")
+    run_dbt(args + list(dbt_args), target=target, target_path=CI_TARGET_PATH,
+            profiles_dir=profiles_dir)
+    return load_artifact("run_results.json", CI_TARGET_PATH)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    dbt_args = []
+    if "--" in argv:
+        argv, dbt_args = argv[:argv.index("--")], argv[argv.index("--") + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0],
+                                     usage="%(prog)s [options] command ... [-- dbt args]")
+    parser.add_argument("--state", default=DEFAULT_STATE,
+                        help="directory holding the production manifest (default: state/prod)")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR,
+                        help="dbt profiles directory (default: the project's profiles/)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    publish = subparsers.add_parser("publish-prod", help="build prod and store its manifest")
+    publish.add_argument("--target", default="prod", help="dbt target (default: %(default)s)")
+    publish.add_argument("--skip-build", action="store_true",
+                         help="only parse, e.g. when prod was built by another job")
+
+    ci = subparsers.add_parser("ci", help="build what changed relative to prod")
+    ci.add_argument("--target", default="ci", help="dbt target (default: %(default)s)")
+    ci.add_argument("--select", default="state:modified+",
+                    help="dbt selection (default: %(default)s)")
+    ci.add_argument("--full-refresh", action="store_true",
+                    help="rebuild modified incremental models from scratch")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "publish-prod":
+            manifest = publish_prod(args.state, args.target, args.profiles_dir, args.skip_build,
+                                    dbt_args)
+            print("Stored the production manifest in {}".format(manifest))
+            return 0
+
+        run_results = run_ci(args.state, args.target, args.profiles_dir, args.select,
+                             args.full_refresh, dbt_args)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+    except DbtCommandError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    built = [result["unique_id"] for result in
+             node_results(run_results, ("model", "seed", "snapshot", "test"))]
+    print("\nBuilt {} node(s) against {}; everything else was deferred to prod:".format(
+        len(built), args.target))
+    for unique_id in sorted(built):
+        print("  {}".format(unique_id))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
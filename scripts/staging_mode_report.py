@@ -0,0 +1,152 @@
+"""Compare staging-layer materializations by what they cost the marts.
+
+Builds the project once per ``staging_materialization`` mode (view, ephemeral and table by default) and reports, for every mart model,
+the size of its compiled SQL and its median build time, plus the total time
+spent in staging and in the whole run. Ephemeral staging inlines the staging
+SQL into every consumer, so the compiled marts grow; views and tables keep
+the marts small but cost a build step (and, for tables, storage) of their own.
+
+By default it runs against the DuckDB ``bench`` target on freshly generated
+fixtures. Pass ``--target`` (and ``--profiles-dir``) to measure on a warehouse
+instead; its sources are used as they are, and the models are full-refreshed
+into that target's schema, so point it at a scratch or CI target.
+
+    python scripts/staging_mode_report.py --scale 10
+    python scripts/staging_mode_report.py --target ci --profiles-dir ~/.dbt
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+
+from benchmark_dag import BENCH_TARGET, bench_event_time_args, prepare_bench_fixtures
+from dbt_artifacts import (
+    PROFILES_DIR, PROJECT_DIR, first_batch_event_time_args, load_artifact, node_results, run_dbt,
+)
+
+MODES = ("view", "ephemeral", "table")
+
+
+def _layer(result):
+    # unique_id is model.<project>.<name>; compiled paths aren't in run_results,
+    # so classify by the model-name prefix convention instead
+    name = result["unique_id"].split(".")[-1]
+    if name.startswith("stg_"):
+        return "staging"
+    if name.startswith(("fact_", "dim_")):
+        return "mart"
+    return "other"
+
+
+def _compiled_bytes(result, target_path):
+    code = result.get("compiled_code")
+    if code is None:
+        # microbatch models report no compiled code; read the model's compiled
+        # file, which dbt writes next to the folder of per-batch files
+        name = result["unique_id"].split(".")[-1]
+        paths = glob.glob(os.path.join(PROJECT_DIR, target_path, "compiled", "**", name + ".sql"),
+                          recursive=True)
+        if not paths:
+            return 0
+        with open(paths[0]) as handle:
+            code = handle.read()
+    return len(code.encode("utf-8"))
+
+
+def measure_mode(mode, env, repeat, threads, target=BENCH_TARGET, profiles_dir=PROFILES_DIR):
+    target_path = os.path.join("target", "staging_mode", mode)
+    args = [
+        "run", "--full-refresh", "--threads", str(threads),
+        "--vars", json.dumps({"staging_materialization": mode}),
+    ]
+    if target == BENCH_TARGET:
+        args += bench_event_time_args()
+    else:
+        args += first_batch_event_time_args()
+    mart_times = {}
+    mart_sizes = {}
+    staging_totals = []
+    run_totals = []
+    for _ in range(repeat):
+        run_dbt(args, target=target, target_path=target_path, profiles_dir=profiles_dir,
+                env=env, quiet=True)
+        run_results = load_artifact("run_results.json", target_path)
+        staging_total = 0.0
+        for result in node_results(run_results):
+            name = result["unique_id"].split(".")[-1]
+            if _layer(result) == "mart":
+                mart_times.setdefault(name, []).append(result["execution_time"])
+                mart_sizes[name] = _compiled_bytes(result, target_path)
+            elif _layer(result) == "staging":
+                staging_total += result["execution_time"]
+        staging_totals.append(staging_total)
+        run_totals.append(run_results["elapsed_time"])
+
+    return {
+        "marts": {
+            name: {
+                "compiled_bytes": mart_sizes[name],
+                "execution_time": round(statistics.median(times), 4),
+            }
+            for name, times in sorted(mart_times.items())
+        },
+        "staging_time": round(statistics.median(staging_totals), 4),
+        "run_time": round(statistics.median(run_totals), 4),
+    }
+
+
+def format_report(report):
+    lines = ["{:<12} {:<24} {:>14} {:>10}".format("mode", "mart", "compiled bytes", "seconds")]
+    for mode, measured in report.items():
+        for name, mart in measured["marts"].items():
+            lines.append("{:<12} {:<24} {:>14,} {:>10.3f}".format(
+                mode, name, mart["compiled_bytes"], mart["execution_time"]))
+        lines.append("{:<12} {:<24} {:>14} {:>10.3f}".format(mode, "(staging layer)", "", measured["staging_time"]))
+        lines.append("{:<12} {:<24} {:>14} {:>10.3f}".format(mode, "(whole run)", "", measured["run_time"]))
+    cheapest = min(report, key=lambda mode: report[mode]["run_time"])
+    lines.append("")
+    lines.append("Fastest whole run: staging_materialization={}".format(cheapest))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default=BENCH_TARGET,
+                        help="dbt target to build; fixtures are only generated for the "
+                             "local %(default)s target (default: %(default)s)")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR,
+                        help="dbt profiles directory (default: the project's profiles/)")
+    parser.add_argument("--scale", type=int, default=10,
+                        help="bench fixture scale factor (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="builds per mode; medians are reported (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="dbt threads (default: %(default)s)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES),
+                        help="staging materializations to compare (default: all)")
+    parser.add_argument("--json", metavar="PATH",
+                        help="also write the measurements to this JSON file")
+    args = parser.parse_args(argv)
+
+    env = prepare_bench_fixtures(args.scale) if args.target == BENCH_TARGET else {}
+    # the models join the seeds; load them once, they don't depend on the mode
+    run_dbt(["seed"], target=args.target, target_path=os.path.join("target", "staging_mode"),
+            profiles_dir=args.profiles_dir, env=env, quiet=True)
+    report = {
+        mode: measure_mode(mode, env, args.repeat, args.threads, args.target, args.profiles_dir)
+        for mode in args.modes
+    }
+
+    print("\n".join(format_report(report)))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+{#
+    SCD2 history of order status. The check strategy on `status` only opens a
+    new version when the status actually changes, while `updated_at` stamps
+    dbt_valid_from / dbt_valid_to with the loader's _etl_loaded_at instead of
+    the snapshot run time.
+#}
+{% snapshot orders_status_snapshot %}
+
+{{
+    config(
+        schema='snapshots',
+        unique_key='order_id',
+        strategy='check',
+        check_cols=['status'],
+        updated_at='_etl_loaded_at',
+        hard_deletes='invalidate',
+        post_hook="{{ create_index(this, ['order_id', 'dbt_valid_to']) }}"
+    )
+}}
+
+select
+    id as order_id,
+    user_id as customer_id,
+    status,
+    _etl_loaded_at
+
+from {{ source('jaffle_shop','orders') }}
+
+{% endsnapshot %}
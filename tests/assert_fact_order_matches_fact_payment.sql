@@ -0,0 +1,39 @@
+-- fact_order's per-order totals must match its payments in fact_payment: a
+-- payment that reached fact_payment but not fact_order (or the other way
+-- round) means one of them missed an incremental update. fact_order only
+-- holds orders from its microbatch `begin` on.
+{% set begin = '1900-01-01' %}
+{% if execute %}
+    {% set fact_order = graph.nodes.values() | selectattr('resource_type', 'equalto', 'model')
+        | selectattr('name', 'equalto', ref('fact_order').identifier) | first %}
+    {% set begin = (fact_order.config.begin | string)[:10] %}
+{% endif %}
+
+with orders as (
+
+    select * from {{ ref('fact_order') }}
+
+),
+
+payments as (
+
+    select
+        order_id,
+        sum(amount) as amount,
+        count(*) as number_of_payments
+    from {{ ref('fact_payment') }}
+    where order_date >= cast('{{ begin }}' as date)
+    group by 1
+
+)
+
+select
+    coalesce(orders.order_id, payments.order_id) as order_id,
+    orders.amount as order_amount,
+    payments.amount as payment_amount,
+    orders.number_of_payments as order_payments,
+    payments.number_of_payments as payment_count
+from orders
+full outer join payments on payments.order_id = orders.order_id
+where orders.amount is distinct from coalesce(payments.amount, 0)
+or orders.number_of_payments is distinct from coalesce(payments.number_of_payments, 0)
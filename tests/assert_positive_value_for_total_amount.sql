@@ -1,6 +1,25 @@
+{{
+    config(
+        meta={'watermark': {'source': ['stripe', 'payment'], 'column': '_batched_at'}}
+    )
+}}
+
+with payments as (
+
+    select * from {{ ref('stg_payments') }}
+
+)
+
 select
-  orderid,
+  order_id,
 	sum(amount) as total_amount
-from {{ ref('stg_payments') }}
+from payments
+{% if var('test_mode') == 'incremental' %}
+-- only orders that received a payment since this test last passed
+where order_id in (
+    select order_id from payments
+    where _batched_at > {{ test_watermark(model.name) }}
+)
+{% endif %}
 group by 1
 having not(total_amount >= 0)
\ No newline at end of file